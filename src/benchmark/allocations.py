@@ -0,0 +1,116 @@
+from typing import Callable, Dict, List
+from unittest import mock
+from market_api.candle import Candle
+from market_api.row import Row
+from market_api.instrument_meta import InstrumentMeta
+from simulator.instrument_context import InstrumentContext
+from simulator.direction import Direction
+from simulator.position import Position
+from simulator.lot import Lot
+import datetime as dt
+import tracemalloc
+import uuid
+
+
+ROW_DATA: Dict = {
+    'volume': 10, 'complete': True,
+    'mid_o': 1.08, 'mid_h': 1.09, 'mid_l': 1.07, 'mid_c': 1.08,
+    'bid_o': 1.08, 'bid_h': 1.09, 'bid_l': 1.07, 'bid_c': 1.08,
+    'ask_o': 1.08, 'ask_h': 1.09, 'ask_l': 1.07, 'ask_c': 1.08,
+}
+
+
+def unslotted(cls: type) -> type:
+    namespace = {
+        name: value for name, value in vars(cls).items()
+        if name not in getattr(cls, '__slots__', ()) and name != '__slots__'
+    }
+
+    return type(f'Unslotted{cls.__name__}', (), namespace)
+
+
+def measure(factory: Callable, count: int) -> float:
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+
+    items = [factory() for _ in range(count)]
+
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    allocated = sum(
+        stat.size_diff for stat in snapshot_after.compare_to(snapshot_before, 'filename')
+    )
+
+    del items
+    return allocated / count
+
+
+def instrument_context() -> InstrumentContext:
+    class PriceContext(InstrumentContext):
+        price = Row(dt.datetime.now(dt.timezone.utc), ROW_DATA)
+
+    return PriceContext(
+        dt.datetime.now(dt.timezone.utc),
+        InstrumentMeta('EUR_USD', 'CURRENCY', 'EUR/USD', 5, -4, 0, 0.0333),
+    )
+
+
+def unslotted_row(time: dt.datetime) -> Callable:
+    row_class = unslotted(Row)
+    candle_class = unslotted(Candle)
+
+    def factory():
+        with mock.patch('market_api.row.Candle', candle_class):
+            return row_class(time, dict(ROW_DATA))
+
+    return factory
+
+
+def uuid_position(instrument: InstrumentContext) -> Callable:
+    position_class = unslotted(Position)
+
+    def factory():
+        position = position_class(instrument, Lot.MICRO, 1, Direction.LONG)
+        position.id = uuid.uuid4()
+        position.handlers = []
+        return position
+
+    return factory
+
+
+def main(count: int = 100000):
+    time = dt.datetime.now(dt.timezone.utc)
+    instrument = instrument_context()
+    candle_class = unslotted(Candle)
+
+    cases: List = [
+        (
+            'Candle', 
+            lambda: candle_class(1.08, 1.08, 1.09, 1.07),
+            lambda: Candle(1.08, 1.08, 1.09, 1.07),
+        ),
+        (
+            'Row', 
+            unslotted_row(time),
+            lambda: Row(time, dict(ROW_DATA)),
+        ),
+        (
+            'Position', 
+            uuid_position(instrument),
+            lambda: Position(instrument, Lot.MICRO, 1, Direction.LONG),
+        ),
+    ]
+
+    print(f'{"object":<10} {"dict bytes":>12} {"slots bytes":>12} {"saved":>8}')
+
+    for name, before, after in cases:
+        bytes_before = measure(before, count)
+        bytes_after = measure(after, count)
+        saved = 1 - bytes_after / bytes_before
+
+        print(f'{name:<10} {bytes_before:>12.0f} {bytes_after:>12.0f} {saved:>8.0%}')
+
+
+if __name__ == '__main__':
+    main()
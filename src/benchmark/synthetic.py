@@ -0,0 +1,138 @@
+from typing import Dict, Iterator, List
+from market_api.granularity import Granularity
+from market_api.a_provider import AProvider
+import datetime as dt
+import numpy as np
+import pandas as pd
+import json
+import os
+
+
+class SyntheticMarket:
+
+    price: float
+    volatility: float
+    spread: float
+    seed: int
+
+    def __init__(
+        self, price: float = 1.08, volatility: float = 0.08,
+        spread: float = 0.00012, seed: int = 0,
+    ):
+        self.price = price
+        self.volatility = volatility
+        self.spread = spread
+        self.seed = seed
+
+    def candles(
+        self, granularity: Granularity,
+        time_from: dt.datetime, time_to: dt.datetime,
+    ) -> pd.DataFrame:
+        rng = np.random.default_rng((self.seed, granularity._value_index))
+
+        times = pd.date_range(
+            time_from, time_to, freq=granularity.time_delta,
+            inclusive='left', tz='UTC',
+        )
+        times = times[self._market_open(times)]
+        count = len(times)
+
+        # annual volatility scaled to the candle length
+        years = granularity.time_delta.total_seconds() / (365 * 24 * 3600)
+        sigma = self.volatility * np.sqrt(years)
+
+        returns = rng.normal(0, sigma, count)
+        close = self.price * np.exp(np.cumsum(returns))
+        open = np.concatenate(([self.price], close[:-1]))
+
+        wick = np.abs(rng.normal(0, sigma / 2, (2, count))) * close
+        high = np.maximum(open, close) + wick[0]
+        low = np.minimum(open, close) - wick[1]
+
+        spread = self.spread * (1 + rng.exponential(0.5, count))
+
+        data = {
+            'time': times,
+            'volume': rng.integers(1, 500, count),
+            'complete': np.ones(count, dtype=bool),
+        }
+
+        for price, shift in (('mid', 0.0), ('bid', -0.5), ('ask', 0.5)):
+            for column, values in (('o', open), ('h', high), ('l', low), ('c', close)):
+                data[f'{price}_{column}'] = np.round(values + shift * spread, 5)
+
+        return pd.DataFrame(data)
+
+    def write_parquets(
+        self, provider: AProvider, symbol: str, granularity: Granularity,
+        time_from: dt.datetime, time_to: dt.datetime,
+    ) -> List[str]:
+        frame = self.candles(granularity, time_from, time_to)
+        manifest = provider.manifest(symbol, granularity)
+        paths = []
+
+        for period_start, period_end in granularity.range_periods(
+            provider.cache_candles, time_from, time_to
+        ):
+            _, directory, full_path = provider._parquet_candle(
+                symbol, granularity, 'MBA', period_start, provider.cache_candles,
+            )
+
+            os.makedirs(directory, exist_ok=True)
+
+            period = frame[(frame.time >= period_start) & (frame.time < period_end)]
+            period.reset_index(drop=True).to_parquet(full_path)
+            manifest.record(period_start, period_end, full_path)
+
+            paths.append(full_path)
+
+        manifest.save()
+
+        return paths
+
+    @staticmethod
+    def write_meta(provider: AProvider, symbol: str) -> str:
+        path = provider._meta_path(symbol)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, 'w') as file:
+            json.dump({
+                'name': symbol,
+                'type': 'CURRENCY',
+                'displayName': symbol.replace('_', '/'),
+                'displayPrecision': 5,
+                'pipLocation': -4,
+                'tradeUnitsPrecision': 0,
+                'marginRate': '0.0333',
+            }, file)
+
+        return path
+
+    @staticmethod
+    def raw_candles(frame: pd.DataFrame) -> Iterator[Dict]:
+        # the JSON shape of the OANDA candles endpoint
+        for row in frame.itertuples(index=False):
+            yield {
+                'time': row.time.strftime('%Y-%m-%dT%H:%M:%S.000000000Z'),
+                'volume': int(row.volume),
+                'complete': bool(row.complete),
+                **{
+                    price: {
+                        column: f'{getattr(row, f"{price}_{column}"):.5f}'
+                        for column in ('o', 'h', 'l', 'c')
+                    }
+                    for price in ('mid', 'bid', 'ask')
+                },
+            }
+
+    @staticmethod
+    def _market_open(times: pd.DatetimeIndex) -> np.ndarray:
+        # FX closes from Friday 21:00 to Sunday 21:00 UTC
+        weekday = times.weekday
+        hour = times.hour
+
+        return ~(
+            ((weekday == 4) & (hour >= 21)) |
+            (weekday == 5) |
+            ((weekday == 6) & (hour < 21))
+        )
@@ -0,0 +1,254 @@
+from typing import Any, Callable, Dict, List, Optional
+from benchmark.synthetic import SyntheticMarket
+from market_api.currency import Currency
+from market_api.granularity import Granularity
+from market_api.instrument_data import InstrumentData
+from market_api.oanda.client import Client
+from market_api.local_provider import LocalProvider
+from market_api.timeframe import Timeframe
+from simulator.a_controller import AController
+from simulator.account import Account
+from simulator.context import Context
+from simulator.direction import Direction
+from simulator.engine import Engine
+from simulator.loop import Loop
+from simulator.lot import Lot
+from simulator.profiler import Profiler, Phase
+from simulator.trade_journal import TradeJournal
+from simulator.watch_list import WatchList
+import datetime as dt
+import subprocess
+import argparse
+import tempfile
+import time
+import json
+import os
+
+
+TIME_FROM = dt.datetime(2023, 1, 2, tzinfo=dt.timezone.utc)
+SYMBOL = 'EUR_USD'
+
+
+class HoldController(AController):
+
+    positions: int
+
+    def __init__(self, positions: int):
+        self.positions = positions
+
+    def tick(
+        self, step: int, context: Context,
+        account: Account, watch_list: WatchList
+    ) -> str:
+        while account.count_running < self.positions:
+            account.position_open(
+                SYMBOL, Lot.MICRO, 1,
+                Direction.LONG if account.count_running % 2 else Direction.SHORT,
+                take_profit=0.0050, stop_loss=0.0050,
+            )
+
+        return 'hold'
+
+
+def timed(function: Callable, repeat: int = 1) -> float:
+    started = time.perf_counter()
+
+    for _ in range(repeat):
+        function()
+
+    return (time.perf_counter() - started) / repeat
+
+
+def time_to(size: int) -> dt.datetime:
+    # weekends are skipped, keep enough calendar time for size M1 candles
+    return TIME_FROM + dt.timedelta(minutes=size * 7 / 5 + 60 * 48)
+
+
+def prepare(directory: str, size: int) -> InstrumentData:
+    provider = LocalProvider(directory)
+    market = SyntheticMarket()
+
+    market.write_meta(provider, SYMBOL)
+
+    for granularity in (Granularity.M1, Granularity.H1):
+        market.write_parquets(provider, SYMBOL, granularity, TIME_FROM, time_to(size))
+
+    return next(provider.instrument_data(
+        [SYMBOL], [Granularity.M1, Granularity.H1], TIME_FROM, time_to(size),
+    ))
+
+
+def bench_parse(size: int) -> Dict[str, Any]:
+    frame = SyntheticMarket().candles(Granularity.M1, TIME_FROM, time_to(size))
+    raw_candles = list(SyntheticMarket.raw_candles(frame.iloc[:size]))
+
+    seconds = timed(lambda: Client._parse_candles(raw_candles))
+    return {'seconds': seconds, 'rate': len(raw_candles) / seconds}
+
+
+def bench_candles(directory: str, size: int) -> Dict[str, Any]:
+    client = Client('', '')
+    client.data_directory = directory
+
+    seconds = timed(lambda: client.candles(
+        SYMBOL, Granularity.M1, 'MBA', TIME_FROM, time_to(size)
+    ))
+
+    return {'seconds': seconds, 'rate': size / seconds}
+
+
+def bench_latest(timeframe: Timeframe, samples: int = 1000) -> Dict[str, Any]:
+    index = timeframe.data.index
+    times = index[::max(1, len(index) // samples)]
+
+    seconds = timed(lambda: [timeframe.get_context(time).latest for time in times])
+    return {'seconds': seconds, 'rate': len(times) / seconds}
+
+
+def bench_indicators(timeframe: Timeframe) -> Dict[str, Any]:
+    def indicators():
+        timeframe.moving_average('mid_c', 20)
+        timeframe.bollinger_bands('mid', 20, 2)
+
+    seconds = timed(indicators)
+    return {'seconds': seconds, 'rate': len(timeframe.data) / seconds}
+
+
+def bench_loop(
+    instrument_data: InstrumentData, engine: Engine, positions: int,
+) -> Dict[str, Any]:
+    account = Account(1000000, Currency.USD, TradeJournal.MEMORY)
+    loop = Loop(account)
+
+    loop.add_instrument(instrument_data)
+    loop.add_controller(HoldController(positions))
+
+    loop.profiler = Profiler()
+
+    seconds = timed(lambda: loop.run(
+        Granularity.M1, loop.time_min, loop.time_max,
+        lambda account, watch_list, output: output.clear(), engine,
+    ))
+
+    stats = loop.profiler.stats()
+
+    return {
+        'seconds': seconds,
+        'rate': stats['steps'] / seconds,
+        'refresh': stats['phases'][Phase.REFRESH.value]['total'],
+        'context': stats['phases'][Phase.CONTEXT.value]['total'],
+    }
+
+
+def commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(
+    sizes: List[int], positions: List[int], engines: List[Engine],
+) -> List[Dict[str, Any]]:
+    results = []
+    revision = commit()
+    recorded = dt.datetime.now(dt.timezone.utc).isoformat()
+
+    def record(case: str, size: int, result: Dict[str, Any], **params):
+        result = {
+            'commit': revision, 'recorded': recorded,
+            'case': case, 'size': size, **params, **result,
+        }
+
+        print(f'{case:<20} {size:>8} {json.dumps(params):<40} {result["seconds"]:>10.4f}s')
+        results.append(result)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            instrument_data = prepare(directory, size)
+            timeframe = instrument_data.timeframes[Granularity.M1]
+
+            record('client_parse', size, bench_parse(size))
+            record('client_candles', size, bench_candles(directory, size))
+            record('time_context_latest', size, bench_latest(timeframe))
+            record('indicators', size, bench_indicators(timeframe))
+
+            for engine in engines:
+                for count in positions:
+                    record(
+                        'loop_run', size, bench_loop(instrument_data, engine, count),
+                        engine=engine.value, positions=count,
+                    )
+
+    return results
+
+
+def save(results: List[Dict[str, Any]], path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'a') as file:
+        for result in results:
+            file.write(json.dumps(result) + '\n')
+
+
+def compare(path: str, base: Optional[str] = None, head: Optional[str] = None):
+    with open(path) as file:
+        results = [json.loads(line) for line in file]
+
+    commits = list(dict.fromkeys(result['commit'] for result in results))
+
+    if len(commits) < 2 and (base is None or head is None):
+        print('Nothing to compare, results of a single commit')
+        return
+
+    base = commits[-2] if base is None else base
+    head = commits[-1] if head is None else head
+
+    def key(result: Dict[str, Any]) -> tuple:
+        return (
+            result['case'], result['size'],
+            result.get('engine'), result.get('positions'),
+        )
+
+    # the latest measurement of each case wins
+    seconds_base = {key(r): r['seconds'] for r in results if r['commit'] == base}
+    seconds_head = {key(r): r['seconds'] for r in results if r['commit'] == head}
+
+    print(f'{"case":<50} {base:>10} {head:>10} {"change":>8}')
+
+    for case, seconds in seconds_head.items():
+        if case not in seconds_base:
+            continue
+
+        change = seconds / seconds_base[case] - 1
+        name = ' '.join(str(part) for part in case if part is not None)
+
+        print(f'{name:<50} {seconds_base[case]:>10.4f} {seconds:>10.4f} {change:>+8.0%}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--positions', type=int, nargs='+', default=[0, 100, 1000])
+    parser.add_argument(
+        '--engines', nargs='+', default=[engine.value for engine in Engine],
+        choices=[engine.value for engine in Engine],
+    )
+    parser.add_argument('--output', default='../data/benchmark/throughput.jsonl')
+    parser.add_argument('--compare', action='store_true')
+
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.output)
+        return
+
+    results = run(args.sizes, args.positions, [Engine(engine) for engine in args.engines])
+    save(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+from abc import ABC, abstractmethod
+from typing import List, Tuple, Iterator, Iterable
+from market_api.timeframe import Timeframe
+from market_api.granularity import Granularity
+from market_api.instrument_meta import InstrumentMeta
+from market_api.instrument_data import InstrumentData
+from market_api.candle_storage import CandleStorage
+from market_api.arrow_store import ArrowStore
+from market_api.candle_manifest import CandleManifest
+import pyarrow.parquet as pq
+import datetime as dt
+import pandas as pd
+import numpy as np
+import os
+
+
+class AProvider(ABC):
+
+    cache_candles: int = 4000
+    data_directory: str = '../data'
+    storage: CandleStorage = CandleStorage.PARQUET
+    save_manifests: bool = True
+
+    @abstractmethod
+    def candles(
+        self, symbol: str, granularity: Granularity, price: str,
+        time_from: dt.datetime, time_to: dt.datetime,
+    ) -> Timeframe:
+        pass
+
+    @abstractmethod
+    def instrument_meta(self, symbols: List[str]) -> Iterator[InstrumentMeta]:
+        pass
+
+    def instrument_data(
+        self, symbols: List[str], granularities: List[Granularity],
+        time_from: dt.datetime, time_to: dt.datetime,
+    ) -> Iterator[InstrumentData]:
+        for instrument_meta in self.instrument_meta(symbols):
+            instrument_data = InstrumentData(instrument_meta)
+            for granularity in granularities:
+                instrument_data.add_timeframe(
+                    self.candles(
+                        instrument_meta.name, granularity, 'MBA', time_from, time_to,
+                    )
+                )
+
+            yield instrument_data
+
+    def manifest(self, symbol: str, granularity: Granularity) -> CandleManifest:
+        return CandleManifest(
+            f'{self.data_directory}/{symbol}/{granularity}/{self.cache_candles}'
+        )
+
+    def _indexed_manifest(
+        self, symbol: str, granularity: Granularity, price: str,
+        periods: Iterable[Tuple[dt.datetime, dt.datetime]],
+    ) -> CandleManifest:
+        # chunks written before the manifest existed are indexed on first use
+        manifest = self.manifest(symbol, granularity)
+
+        for period_start, period_end in periods:
+            if manifest.chunk(period_start) is None:
+                _, _, full_path = self._parquet_candle(
+                    symbol, granularity, price, period_start, self.cache_candles,
+                )
+
+                if os.path.isfile(full_path):
+                    manifest.record(period_start, period_end, full_path)
+
+        if self.save_manifests:
+            manifest.save()
+
+        return manifest
+
+    def _load_candles(
+        self, symbol: str, granularity: Granularity, price: str, manifest: CandleManifest,
+        covered_from: dt.datetime, covered_to: dt.datetime,
+        time_from: dt.datetime, time_to: dt.datetime,
+    ) -> pd.DataFrame:
+        match self.storage:
+            case CandleStorage.PARQUET:
+                return self._read_candles(manifest, time_from, time_to)
+            case CandleStorage.ARROW:
+                return self._load_arrow(
+                    symbol, granularity, price, manifest,
+                    covered_from, covered_to, time_from, time_to,
+                )
+
+    def _load_arrow(
+        self, symbol: str, granularity: Granularity, price: str, manifest: CandleManifest,
+        covered_from: dt.datetime, covered_to: dt.datetime,
+        time_from: dt.datetime, time_to: dt.datetime,
+    ) -> pd.DataFrame:
+        # only complete chunks are mapped, the incomplete tail is read from
+        # its parquet chunks so refreshing it never rewrites the file
+        store = ArrowStore(self.data_directory)
+        complete_to = pd.Timestamp(covered_from)
+
+        for period_start, period_end in granularity.range_periods(
+            self.cache_candles, covered_from, covered_to,
+        ):
+            chunk = manifest.chunk(period_start)
+
+            if chunk is not None and not chunk.complete:
+                break
+
+            complete_to = pd.Timestamp(period_end)
+
+        if complete_to <= covered_from:
+            return self._read_candles(manifest, time_from, time_to)
+
+        if not store.covers(symbol, granularity, covered_from, complete_to):
+            self._write_arrow(store, symbol, granularity, price, covered_from, complete_to)
+
+        if time_to < complete_to:
+            return store.read(symbol, granularity, time_from, time_to)
+
+        mapped = store.read(symbol, granularity, time_from, complete_to - pd.Timedelta(1, 'ns'))
+        tail = self._read_candles(manifest, complete_to, time_to)
+
+        if len(tail) == 0:
+            return mapped
+
+        return pd.concat([mapped, tail])
+
+    def _write_arrow(
+        self, store: ArrowStore, symbol: str, granularity: Granularity, price: str,
+        covered_from: dt.datetime, covered_to: dt.datetime,
+    ):
+        # rows the file already maps are reused, only the ranges it does not
+        # cover yet are read from the parquet chunks
+        coverage = store.coverage(symbol, granularity)
+        covered_from, covered_to = pd.Timestamp(covered_from), pd.Timestamp(covered_to)
+        frames = []
+
+        if coverage is not None:
+            mapped_from = pd.Timestamp(coverage[0], tz='UTC')
+            mapped_to = pd.Timestamp(coverage[1], tz='UTC')
+
+            # a disjoint range only joins the file if the gap is on disk
+            if self._gap_complete(
+                symbol, granularity, price,
+                min(covered_to, mapped_to), max(covered_from, mapped_from),
+            ):
+                frames.append(store.read(
+                    symbol, granularity, mapped_from, mapped_to - pd.Timedelta(1, 'ns'),
+                ))
+                covered_from = min(covered_from, mapped_from)
+                covered_to = max(covered_to, mapped_to)
+            else:
+                coverage = None
+
+        manifest = self._indexed_manifest(
+            symbol, granularity, price,
+            granularity.range_periods(self.cache_candles, covered_from, covered_to),
+        )
+
+        if coverage is None:
+            frames.append(self._read_candles(
+                manifest, covered_from, covered_to - pd.Timedelta(1, 'ns'),
+            ))
+        else:
+            if covered_from < mapped_from:
+                frames.insert(0, self._read_candles(
+                    manifest, covered_from, mapped_from - pd.Timedelta(1, 'ns'),
+                ))
+
+            if mapped_to < covered_to:
+                frames.append(self._read_candles(
+                    manifest, mapped_to, covered_to - pd.Timedelta(1, 'ns'),
+                ))
+
+        frame = frames[0] if len(frames) == 1 else pd.concat(frames)
+        store.write(symbol, granularity, frame, covered_from, covered_to)
+
+    def _gap_complete(
+        self, symbol: str, granularity: Granularity, price: str,
+        gap_from: dt.datetime, gap_to: dt.datetime,
+    ) -> bool:
+        if gap_from >= gap_to:
+            return True
+
+        periods = list(granularity.range_periods(self.cache_candles, gap_from, gap_to))
+        manifest = self._indexed_manifest(symbol, granularity, price, periods)
+
+        return all(
+            chunk is not None and chunk.complete
+            for chunk in (manifest.chunk(period_start) for period_start, _ in periods)
+        )
+
+    def _read_candles(
+        self, manifest: CandleManifest, time_from: dt.datetime, time_to: dt.datetime,
+    ) -> pd.DataFrame:
+        # only chunks overlapping the range are opened and the range is pushed
+        # into the row group read
+        chunks = manifest.overlapping(time_from, time_to)
+        paths = [manifest.full_path(chunk) for chunk in chunks]
+
+        filters = [('time', '>=', time_from), ('time', '<=', time_to)]
+
+        frames = [pq.read_table(path, filters=filters).to_pandas() for path in paths]
+        frames = [frame for frame in frames if len(frame) > 0]
+
+        if not frames:
+            return self._empty_candles()
+
+        return pd.concat(frames, ignore_index=True).set_index('time')
+
+    @staticmethod
+    def _empty_candles() -> pd.DataFrame:
+        columns = {
+            'volume': np.array([], dtype=np.int64),
+            'complete': np.array([], dtype=bool),
+        }
+
+        for price in ['mid', 'bid', 'ask']:
+            for oh in ['o', 'h', 'l', 'c']:
+                columns[f'{price}_{oh}'] = np.array([], dtype=np.float64)
+
+        return pd.DataFrame(columns, index=pd.DatetimeIndex([], tz='UTC', name='time'))
+
+    def _meta_path(self, symbol: str) -> str:
+        return f'{self.data_directory}/{symbol}/meta.json'
+
+    def _parquet_candle(
+        self, symbol: str, granularity: Granularity, price: str,
+        period_start: dt.datetime, period_length: int
+    ) -> Tuple[str, str, str]:
+        directory = f'{self.data_directory}/{symbol}/{granularity}/{period_length}'
+
+        if granularity < Granularity.H1:
+            directory = f'{directory}/{period_start.year}'
+
+            if granularity < Granularity.M1:
+                directory = f'{directory}/{period_start.month}'
+
+        parquet_name = f'{symbol}_{granularity}_{period_length}_{period_start}'
+        parquet_name = parquet_name \
+            .replace('.', '-') \
+            .replace(' ', '-') \
+            .replace(':', '-') \
+            .lower() \
+
+        full_path = f'{directory}/{parquet_name}.parquet'
+
+        return parquet_name, directory, full_path
@@ -0,0 +1,92 @@
+from typing import Optional, Tuple
+from market_api.granularity import Granularity
+from market_api.timeframe_arrays import TimeframeArrays
+import datetime as dt
+import pyarrow as pa
+import pandas as pd
+import numpy as np
+import os
+
+
+class ArrowStore:
+
+    directory: str
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, symbol: str, granularity: Granularity) -> str:
+        return f'{self.directory}/{symbol}/{granularity}.arrow'
+
+    def coverage(self, symbol: str, granularity: Granularity) -> Optional[Tuple[int, int]]:
+        path = self.path(symbol, granularity)
+
+        if not os.path.isfile(path):
+            return None
+
+        with pa.memory_map(path, 'r') as source:
+            metadata = pa.ipc.open_file(source).schema.metadata
+
+        return int(metadata[b'covered_from']), int(metadata[b'covered_to'])
+
+    def covers(
+        self, symbol: str, granularity: Granularity,
+        time_from: dt.datetime, time_to: dt.datetime,
+    ) -> bool:
+        coverage = self.coverage(symbol, granularity)
+
+        return coverage is not None and (
+            coverage[0] <= TimeframeArrays.time_value(time_from) and
+            TimeframeArrays.time_value(time_to) <= coverage[1]
+        )
+
+    def write(
+        self, symbol: str, granularity: Granularity, frame: pd.DataFrame,
+        covered_from: dt.datetime, covered_to: dt.datetime,
+    ):
+        path = self.path(symbol, granularity)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        columns = {'time': np.asarray(frame.index.asi8, dtype=np.int64)}
+        for name in frame.columns:
+            columns[name] = frame[name].to_numpy()
+
+        table = pa.table(columns).replace_schema_metadata({
+            'covered_from': str(TimeframeArrays.time_value(covered_from)),
+            'covered_to': str(TimeframeArrays.time_value(covered_to)),
+        })
+
+        # uncompressed and in a single batch, every column maps to one buffer
+        with pa.OSFile(f'{path}.tmp', 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table.combine_chunks(), max_chunksize=max(len(table), 1))
+
+        os.replace(f'{path}.tmp', path)
+
+    def read(
+        self, symbol: str, granularity: Granularity,
+        time_from: dt.datetime, time_to: dt.datetime,
+    ) -> pd.DataFrame:
+        source = pa.memory_map(self.path(symbol, granularity), 'r')
+        table = pa.ipc.open_file(source).read_all()
+
+        def column(name: str) -> np.ndarray:
+            array = table.column(name)
+            return array.chunk(0).to_numpy(zero_copy_only=False) if array.num_chunks else np.array([])
+
+        times = column('time')
+        start = np.searchsorted(times, TimeframeArrays.time_value(time_from), 'left')
+        stop = np.searchsorted(times, TimeframeArrays.time_value(time_to), 'right')
+
+        # slices of the mapped buffers, pages are shared between processes
+        columns = {
+            name: column(name)[start:stop]
+            for name in table.column_names if name != 'time'
+        }
+
+        frame = pd.DataFrame(
+            columns, index=pd.to_datetime(times[start:stop], utc=True), copy=False
+        )
+        frame.index.name = 'time'
+
+        return frame
@@ -1,8 +1,12 @@
+from typing import Tuple
 import datetime as dt
+import numpy as np
 
 
 class Candle:
 
+    __slots__ = ('open', 'close', 'high', 'low')
+
     open: float
     close: float
     high: float
@@ -44,4 +48,37 @@ class Candle:
     @property
     def shadow_down(self) -> float:
         return min(self.open, self.close) - self.low
-    
\ No newline at end of file
+    
+
+class CandleView(Candle):
+
+    __slots__ = ('columns', 'position')
+
+    columns: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+    position: int
+
+    def __init__(
+        self, columns: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray], 
+        position: int,
+    ):
+        self.columns = columns
+        self.position = position
+
+    def __reduce__(self):
+        return Candle, (self.open, self.close, self.high, self.low)
+
+    @property
+    def open(self) -> float:
+        return self.columns[0].item(self.position)
+
+    @property
+    def close(self) -> float:
+        return self.columns[1].item(self.position)
+
+    @property
+    def high(self) -> float:
+        return self.columns[2].item(self.position)
+
+    @property
+    def low(self) -> float:
+        return self.columns[3].item(self.position)
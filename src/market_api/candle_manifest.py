@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional
+from market_api.timeframe_arrays import TimeframeArrays
+import pyarrow.parquet as pq
+import pyarrow.compute as pc
+import datetime as dt
+import json
+import os
+
+
+class CandleChunk:
+
+    file: str
+    period_start: int
+    period_end: int
+    time_min: Optional[int]
+    time_max: Optional[int]
+    rows: int
+    size: int
+    complete: bool
+    time_complete: Optional[int]
+
+    def __init__(
+        self, file: str, period_start: int, period_end: int,
+        time_min: Optional[int], time_max: Optional[int],
+        rows: int, size: int, complete: bool, time_complete: Optional[int] = None,
+    ):
+        self.file = file
+        self.period_start = period_start
+        self.period_end = period_end
+        self.time_min = time_min
+        self.time_max = time_max
+        self.rows = rows
+        self.size = size
+        self.complete = complete
+        self.time_complete = time_complete
+
+
+class CandleManifest:
+
+    directory: str
+    chunks: Dict[int, CandleChunk]
+    changed: bool
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.chunks = {}
+        self.changed = False
+
+        if os.path.isfile(self.path):
+            with open(self.path) as file:
+                for raw_chunk in json.load(file)['chunks']:
+                    chunk = CandleChunk(**raw_chunk)
+                    self.chunks[chunk.period_start] = chunk
+
+    @property
+    def path(self) -> str:
+        return f'{self.directory}/manifest.json'
+
+    def chunk(self, period_start: dt.datetime) -> Optional[CandleChunk]:
+        return self.chunks.get(TimeframeArrays.time_value(period_start))
+
+    def full_path(self, chunk: CandleChunk) -> str:
+        return f'{self.directory}/{chunk.file}'
+
+    def record(
+        self, period_start: dt.datetime, period_end: dt.datetime, full_path: str,
+    ) -> CandleChunk:
+        # a chunk is complete once its period is over and every candle in it
+        # is final, anything else is downloaded again on refresh
+        parquet = pq.ParquetFile(full_path)
+        time_min = time_max = time_complete = None
+        complete = period_end <= dt.datetime.now(dt.timezone.utc)
+
+        if 'time' in parquet.schema_arrow.names and parquet.metadata.num_rows > 0:
+            table = parquet.read(columns=['time', 'complete'])
+            time_min, time_max = (
+                value.value for value in pc.min_max(table['time']).values()
+            )
+            complete = complete and pc.all(table['complete']).as_py()
+            time_complete = pc.max(pc.filter(table['time'], table['complete'])).value
+
+        chunk = CandleChunk(
+            os.path.relpath(full_path, self.directory),
+            TimeframeArrays.time_value(period_start), TimeframeArrays.time_value(period_end),
+            time_min, time_max, parquet.metadata.num_rows, os.path.getsize(full_path),
+            complete, time_complete,
+        )
+
+        self.chunks[chunk.period_start] = chunk
+        self.changed = True
+
+        return chunk
+
+    def overlapping(self, time_from: dt.datetime, time_to: dt.datetime) -> List[CandleChunk]:
+        value_from = TimeframeArrays.time_value(time_from)
+        value_to = TimeframeArrays.time_value(time_to)
+
+        return [
+            chunk for _, chunk in sorted(self.chunks.items())
+            if chunk.rows > 0 and chunk.time_max >= value_from and chunk.time_min <= value_to
+        ]
+
+    def save(self):
+        if not self.changed:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        with open(f'{self.path}.tmp', 'w') as file:
+            json.dump({
+                'chunks': [vars(chunk) for _, chunk in sorted(self.chunks.items())],
+            }, file)
+
+        os.replace(f'{self.path}.tmp', self.path)
+        self.changed = False
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class CandleStorage(Enum):
+
+    PARQUET = 'parquet'
+    ARROW = 'arrow'
@@ -44,6 +44,10 @@ class Currency(Enum):
     def exchange_rate(self) -> float:
         return EXCHANGE_RATES[self.value]
     
+    @property
+    def decimals(self) -> int:
+        return ROUND_DECIMALS[self.value]
+    
     def convert(self, value: float, currency_to: 'Currency') -> float:
         return value * self.exchange_rate / currency_to.exchange_rate
     
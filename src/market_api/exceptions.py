@@ -1,3 +1,4 @@
+from typing import Optional
 import datetime as dt
 from market_api.granularity import Granularity
 
@@ -6,4 +7,10 @@ class ConversionRateNotFoundError(Exception):
     
     def __init__(self, from_currency: str, to_currency: str):
         super().__init__(f'No conversion rate found for {from_currency} to {to_currency}')
-        
\ No newline at end of file
+        
+
+class LocalDataMissingError(Exception):
+
+    def __init__(self, symbol: str, granularity: Optional[Granularity], directory: str):
+        subject = 'meta' if granularity is None else f'{granularity.value} candles'
+        super().__init__(f'No local {subject} for {symbol} in {directory}')
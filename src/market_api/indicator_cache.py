@@ -0,0 +1,80 @@
+from typing import Callable, Dict, Any, List
+from market_api.granularity import Granularity
+from market_api.a_provider import AProvider
+import pandas as pd
+import numpy as np
+import hashlib
+import glob
+import os
+
+
+class IndicatorCache:
+
+    directory: str
+    period_size: int
+
+    def __init__(
+        self, directory: str = AProvider.data_directory,
+        period_size: int = AProvider.cache_candles,
+    ):
+        self.directory = directory
+        self.period_size = period_size
+
+    def columns(
+        self, symbol: str, granularity: Granularity, frame: pd.DataFrame,
+        name: str, params: Dict[str, Any], sources: List[str], warmup: int,
+        compute: Callable[[pd.DataFrame], pd.DataFrame],
+    ) -> pd.DataFrame:
+        if len(frame) == 0:
+            return compute(frame)
+
+        directory = self._directory(symbol, granularity, name, params)
+        os.makedirs(directory, exist_ok=True)
+
+        chunks = []
+
+        for start, stop, period_start in self._chunks(granularity, frame.index):
+            # the warm-up rows before the chunk are part of the fingerprint,
+            # cached values are only reused for the same input
+            source = frame.iloc[max(0, start - warmup):stop][sources]
+            fingerprint = self._fingerprint(source)
+
+            prefix = period_start.strftime('%Y%m%dT%H%M%S')
+            path = f'{directory}/{prefix}-{fingerprint}.parquet'
+
+            if os.path.isfile(path):
+                chunks.append(pd.read_parquet(path))
+                continue
+
+            chunk = compute(source).iloc[start - max(0, start - warmup):]
+
+            for stale in glob.glob(f'{directory}/{prefix}-*.parquet'):
+                os.remove(stale)
+
+            chunk.to_parquet(path)
+            chunks.append(chunk)
+
+        return pd.concat(chunks)
+
+    def _chunks(self, granularity: Granularity, index: pd.DatetimeIndex):
+        periods = granularity.range_periods(
+            self.period_size, index[0], index[-1] + granularity.time_delta
+        )
+
+        for period_start, period_end in periods:
+            start = index.searchsorted(period_start, 'left')
+            stop = index.searchsorted(period_end, 'left')
+
+            if stop > start:
+                yield start, stop, period_start
+
+    def _directory(
+        self, symbol: str, granularity: Granularity, name: str, params: Dict[str, Any],
+    ) -> str:
+        params_key = '_'.join(f'{key}-{value}' for key, value in sorted(params.items()))
+        return f'{self.directory}/{symbol}/{granularity}/indicators/{name}/{params_key}'
+
+    @staticmethod
+    def _fingerprint(frame: pd.DataFrame) -> str:
+        hashed = pd.util.hash_pandas_object(frame, index=True).to_numpy()
+        return hashlib.sha1(np.ascontiguousarray(hashed).tobytes()).hexdigest()[:16]
@@ -1,11 +1,19 @@
 import pandas as pd
 from abc import ABC
-from typing import List
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING
+from market_api.granularity import Granularity
 import dask.dataframe as dd
 
+if TYPE_CHECKING:
+    from market_api.indicator_cache import IndicatorCache
+
 
 class IndicatorsMixin(ABC):
 
+    indicator_cache: Optional['IndicatorCache'] = None
+
+    symbol: str
+    granularity: Granularity
     data: dd.DataFrame
     traces: List[str]
 
@@ -23,8 +31,14 @@ class IndicatorsMixin(ABC):
         #     func, period=period,
         #     before=100, after=100,
         # )
-        self.data[name] = self.data[column].rolling(window=period).mean()
-        self.traces.append(name)
+        def compute(data: pd.DataFrame) -> pd.DataFrame:
+            return pd.DataFrame({
+                name: data[column].rolling(window=period).mean()
+            }, index=data.index)
+
+        self._add_indicator(
+            name, {'column': column, 'period': period}, [column], period, compute
+        )
 
     def bollinger_bands(self, price_type: str, period: int, std: float, name: str = None):
         if name is None:
@@ -33,13 +47,34 @@ class IndicatorsMixin(ABC):
         def price(phase: str) -> str:
             return f'{price_type}_{phase}'
         
-        typical_price = (self.data[price('h')] + self.data[price('l')] + self.data[price('c')]) / 3
-        std_dev = typical_price.rolling(window=period).std()
-        ma = typical_price.rolling(window=period).mean()
+        def compute(data: pd.DataFrame) -> pd.DataFrame:
+            typical_price = (data[price('h')] + data[price('l')] + data[price('c')]) / 3
+            std_dev = typical_price.rolling(window=period).std()
+            ma = typical_price.rolling(window=period).mean()
+
+            return pd.DataFrame({
+                f'{name}_ma': ma,
+                f'{name}_up': ma + (std_dev * std),
+                f'{name}_lo': ma - (std_dev * std),
+            }, index=data.index)
+
+        self._add_indicator(
+            name, {'price': price_type, 'period': period, 'std': std},
+            [price('h'), price('l'), price('c')], period, compute,
+        )
 
-        self.data[f'{name}_ma'] = ma
-        self.data[f'{name}_up'] = ma + (std_dev * std)
-        self.data[f'{name}_lo'] = ma - (std_dev * std)
+    def _add_indicator(
+        self, name: str, params: Dict[str, Any], sources: List[str], warmup: int,
+        compute: Callable[[pd.DataFrame], pd.DataFrame],
+    ):
+        if self.indicator_cache is None:
+            columns = compute(self.data)
+        else:
+            columns = self.indicator_cache.columns(
+                self.symbol, self.granularity, self.data,
+                name, params, sources, warmup, compute,
+            )
 
-        for trace in ['ma', 'up', 'lo']:
-            self.traces.append(f'{name}_{trace}')
+        for column in columns.columns:
+            self.data[column] = columns[column]
+            self.traces.append(column)
@@ -0,0 +1,64 @@
+from typing import Dict, List, Iterator, Tuple
+from market_api.a_provider import AProvider
+from market_api.timeframe import Timeframe
+from market_api.granularity import Granularity
+from market_api.instrument_meta import InstrumentMeta
+from market_api.exceptions import LocalDataMissingError
+from market_api.candle_storage import CandleStorage
+from market_api.arrow_store import ArrowStore
+from market_api.candle_manifest import CandleManifest
+import datetime as dt
+import json
+import os
+
+
+class LocalProvider(AProvider):
+
+    save_manifests: bool = False
+
+    _manifests: Dict[Tuple[str, Granularity], CandleManifest]
+
+    def __init__(self, data_directory: str = AProvider.data_directory):
+        self.data_directory = data_directory
+        self._manifests = {}
+
+    def manifest(self, symbol: str, granularity: Granularity) -> CandleManifest:
+        # the data directory may be a read-only shared dataset, chunks missing
+        # from its manifest are indexed in memory once per provider
+        key = (symbol, granularity)
+
+        if key not in self._manifests:
+            self._manifests[key] = super().manifest(symbol, granularity)
+
+        return self._manifests[key]
+
+    def candles(
+        self, symbol: str, granularity: Granularity, price: str,
+        time_from: dt.datetime, time_to: dt.datetime,
+    ) -> Timeframe:
+        periods = list(granularity.range_periods(self.cache_candles, time_from, time_to))
+        manifest = self._indexed_manifest(symbol, granularity, price, periods)
+
+        covered_from, covered_to = periods[0][0], periods[-1][1]
+        mapped = self.storage == CandleStorage.ARROW and ArrowStore(self.data_directory) \
+            .covers(symbol, granularity, covered_from, covered_to)
+
+        if not manifest.overlapping(time_from, time_to) and not mapped:
+            raise LocalDataMissingError(symbol, granularity, self.data_directory)
+
+        return Timeframe(
+            symbol, granularity, self._load_candles(
+                symbol, granularity, price, manifest, covered_from, covered_to,
+                time_from, time_to,
+            )
+        )
+
+    def instrument_meta(self, symbols: List[str]) -> Iterator[InstrumentMeta]:
+        for symbol in symbols:
+            path = self._meta_path(symbol)
+
+            if not os.path.isfile(path):
+                raise LocalDataMissingError(symbol, None, self.data_directory)
+
+            with open(path) as file:
+                yield InstrumentMeta.from_oanda(json.load(file))
@@ -1,132 +1,291 @@
 import requests
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pprint import pprint
-from dateutil import parser
+from operator import itemgetter
+from requests.adapters import HTTPAdapter
+from rich.progress import Progress
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from market_api.timeframe import Timeframe
 from market_api.granularity import Granularity
 from market_api.instrument_meta import InstrumentMeta
 from market_api.instrument_data import InstrumentData
+from market_api.a_provider import AProvider
+from market_api.candle_manifest import CandleManifest
+from market_api.oanda.rate_limiter import RateLimiter
 import datetime as dt
-from typing import List, Dict, Tuple, Iterator
-from dask import dataframe as dd
+from typing import List, Dict, Iterator, Optional, Set, Tuple
+import threading
+import json
+import time
 import os
 import pytz
 
 
-class Client:
+class Client(AProvider):
 
     OANDA_URL: str = 'https://api-fxpractice.oanda.com/v3'
     DATE_FORMAT: str = '%Y-%m-%dT%H:%M:%S'
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
 
     account_id: str
     api_key: str
-    cache_candles: int = 4000
     refresh_incomplete: bool = True
     timezone_market = 'Etc/GMT+4'
+    workers: int = 8
+    requests_per_second: float = 100
+    retries: int = 5
+    backoff: float = 0.5
+    timeout: float = 30
+    _rate_limiter: Optional[RateLimiter]
+    _session: Optional[requests.Session]
+    _prefetched: Set[str]
+    _lock: threading.Lock
 
     def __init__(self, account_id: str, api_key: str):
         self.account_id = account_id
         self.api_key = api_key
+        self._rate_limiter = None
+        self._session = None
+        self._prefetched = set()
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        # one pooled session shared by all download threads
+        if self._session is None:
+            adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+
+            self._session = requests.Session()
+            self._session.headers.update(self._get_headers())
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+
+        return self._session
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        # built on first use and rebuilt when requests_per_second is tuned,
+        # download threads share a single one
+        with self._lock:
+            if self._rate_limiter is None or (
+                self._rate_limiter.interval != 1 / self.requests_per_second
+            ):
+                self._rate_limiter = RateLimiter(self.requests_per_second)
+
+            return self._rate_limiter
 
     def candles(
         self, symbol: str, granularity: Granularity, price: str,
         time_from: dt.datetime, time_to: dt.datetime, params: dict = {},
     ) -> Timeframe:
-        url = f'{self.OANDA_URL}/instruments/{symbol}/candles'
+        periods = list(granularity.range_periods(
+            self.cache_candles, time_from, time_to
+        ))
 
-        params['granularity'] = granularity.value
-        params['price'] = price
+        manifest = self._indexed_manifest(symbol, granularity, price, periods)
 
-        periods = granularity.range_periods(
-            self.cache_candles, time_from, time_to
+        downloads = [
+            download for download in self._downloads(
+                symbol, granularity, price, manifest, periods, params,
+            )
+            if download[3] not in self._prefetched
+        ]
+        self._download(downloads)
+
+        return Timeframe(
+            symbol, granularity, self._load_candles(
+                symbol, granularity, price, manifest, periods[0][0], periods[-1][1],
+                time_from, time_to,
+            )
         )
 
-        parquets = []
+    def instrument_data(
+        self, symbols: List[str], granularities: List[Granularity],
+        time_from: dt.datetime, time_to: dt.datetime,
+    ) -> Iterator[InstrumentData]:
+        self.prefetch(symbols, granularities, 'MBA', time_from, time_to)
+
+        try:
+            yield from super().instrument_data(symbols, granularities, time_from, time_to)
+        finally:
+            self._prefetched.clear()
+
+    def prefetch(
+        self, symbols: List[str], granularities: List[Granularity], price: str,
+        time_from: dt.datetime, time_to: dt.datetime,
+    ):
+        downloads = []
+
+        for symbol in symbols:
+            for granularity in granularities:
+                periods = list(granularity.range_periods(self.cache_candles, time_from, time_to))
+                manifest = self._indexed_manifest(symbol, granularity, price, periods)
+
+                downloads.extend(
+                    self._downloads(symbol, granularity, price, manifest, periods, {})
+                )
+
+        self._download(downloads)
+        self._prefetched.update(download[3] for download in downloads)
+
+    def _downloads(
+        self, symbol: str, granularity: Granularity, price: str, manifest: CandleManifest,
+        periods: List[Tuple[dt.datetime, dt.datetime]], params: dict,
+    ) -> List[Tuple[CandleManifest, dt.datetime, dt.datetime, str, str, dict, Optional[pd.Timestamp]]]:
+        url = f'{self.OANDA_URL}/instruments/{symbol}/candles'
+        downloads = []
 
         for period_start, period_end in periods:
-            parquet_name, directory, full_path = self._parquet_candle(
+            chunk = manifest.chunk(period_start)
+
+            if chunk is not None and (chunk.complete or not self.refresh_incomplete):
+                continue
+
+            _, directory, full_path = self._parquet_candle(
                 symbol, granularity, price, period_start, self.cache_candles,
             )
 
-            parquets.append(full_path)
             os.makedirs(directory, exist_ok=True)
 
             current_time_market = dt.datetime.now(pytz.timezone(self.timezone_market))
-            incomplete = True if current_time_market <= period_end else False
-            period_end_corrected = current_time_market if incomplete else period_end
+            period_end_corrected = min(current_time_market, period_end) \
+                .astimezone(pytz.UTC).replace(microsecond=0)
 
-            if (not os.path.isfile(full_path)) or (self.refresh_incomplete and incomplete):
-                print(f'downloading parquet {parquet_name}')
+            # a stored incomplete chunk only asks for the candles after its
+            # last complete one
+            kept = None
+            download_from = period_start
 
-                params['from'] = period_start.strftime(self.DATE_FORMAT)
-                params['to'] = period_end_corrected.strftime(self.DATE_FORMAT)
+            if chunk is not None and chunk.time_complete is not None and \
+                    self._delta_compatible(full_path):
+                kept = pd.Timestamp(chunk.time_complete, tz='UTC')
+                download_from = kept + granularity.time_delta
 
-                session = requests.Session()
-                session.headers.update(self._get_headers())
+            if download_from >= period_end_corrected:
+                continue
 
-                response = session.get(url, params=params, data=None, headers=None)
-                raw_data = response.json()
+            downloads.append((manifest, period_start, period_end, full_path, url, {
+                **params,
+                'granularity': granularity.value,
+                'price': price,
+                'from': download_from.strftime(self.DATE_FORMAT),
+                'to': period_end_corrected.strftime(self.DATE_FORMAT),
+            }, kept))
 
-                if 'candles' not in raw_data:
-                    pprint(raw_data)
-                    raise ValueError('Invalid response')
-                
-                processed_data = []
+        return downloads
 
-                for raw_candle in raw_data['candles']:
-                    candle = {
-                        'time': parser.parse(raw_candle['time']),
-                        'volume': int(raw_candle['volume']),
-                        'complete': bool(raw_candle['complete']),
-                    }
+    def _download(
+        self, downloads: List[Tuple[CandleManifest, dt.datetime, dt.datetime, str, str, dict, Optional[pd.Timestamp]]],
+    ):
+        if not downloads:
+            return
 
-                    for price in ['mid', 'bid', 'ask']:
-                        for oh in ['o', 'h', 'l', 'c']:
-                            candle[f'{price}_{oh}'] = float(raw_candle[price][oh])
+        with Progress(transient=True) as progress:
+            task = progress.add_task('downloading candles', total=len(downloads))
 
-                    processed_data.append(candle)
-                
-                dataframe = pd.DataFrame(processed_data)
-                dataframe.to_parquet(full_path)
+            with ThreadPoolExecutor(self.workers) as executor:
+                futures = {
+                    executor.submit(self._download_parquet, full_path, url, params, kept): (
+                        manifest, period_start, period_end, full_path,
+                    )
+                    for manifest, period_start, period_end, full_path, url, params, kept in downloads
+                }
 
-        dataframes = []
-        for parquet in parquets:
-            ddf = dd.read_parquet(parquet)
-            if len(ddf) > 0:
-                dataframes.append(ddf)
+                # manifests are only touched here, on the calling thread
+                for future in as_completed(futures):
+                    future.result()
 
-        ddf = dd.concat(dataframes)
-        ddf = ddf[ddf.time >= time_from][ddf.time <= time_to]
+                    manifest, period_start, period_end, full_path = futures[future]
+                    manifest.record(period_start, period_end, full_path)
+
+                    progress.advance(task)
+
+        for manifest in {id(download[0]): download[0] for download in downloads}.values():
+            manifest.save()
+
+    def _download_parquet(
+        self, full_path: str, url: str, params: dict, kept: Optional[pd.Timestamp],
+    ):
+        raw_data = self._get(url, params)
+
+        if 'candles' not in raw_data:
+            pprint(raw_data)
+            raise ValueError('Invalid response')
+
+        table = pa.Table.from_pandas(
+            self._parse_candles(raw_data['candles']), preserve_index=False,
+        )
+
+        if kept is not None:
+            # the new candles replace the stored trailing incomplete one,
+            # concatenating fails on a stored chunk with other dtypes
+            stored = pq.read_table(full_path, filters=[('time', '<=', kept)])
+            table = pa.concat_tables([
+                stored.replace_schema_metadata(table.schema.metadata), table,
+            ])
+
+        pq.write_table(table, f'{full_path}.tmp')
+        os.replace(f'{full_path}.tmp', full_path)
+
+    def _delta_compatible(self, full_path: str) -> bool:
+        # chunks stored with other dtypes, e.g. a naive time column, are
+        # downloaded whole instead of extended
+        candles = pa.Schema.from_pandas(self._parse_candles([]), preserve_index=False)
+
+        return pq.read_schema(full_path).remove_metadata().equals(candles.remove_metadata())
+
+    def instrument_meta(self, symbols: List[str]) -> Iterator[InstrumentMeta]:
+        cached = [self._meta_path(symbol) for symbol in symbols]
+
+        if all(os.path.isfile(path) for path in cached):
+            for path in cached:
+                with open(path) as file:
+                    yield InstrumentMeta.from_oanda(json.load(file))
+            return
 
-        return Timeframe(symbol, granularity, ddf)
-    
-    def instrument_meta(self, symbol: List[str]) -> Iterator[InstrumentMeta]:
         url = f'{self.OANDA_URL}/accounts/{self.account_id}/instruments'
-        params = {'instruments': ','.join(symbol)}
+        params = {'instruments': ','.join(symbols)}
 
-        session = requests.Session()
-        session.headers.update(self._get_headers())
+        raw_data = self._get(url, params)
 
-        response = session.get(url, params=params, data=None, headers=None)
-        raw_data = response.json()
-        
         for raw_instrument in raw_data['instruments']:
+            path = self._meta_path(raw_instrument['name'])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            with open(path, 'w') as file:
+                json.dump(raw_instrument, file)
+
             yield InstrumentMeta.from_oanda(raw_instrument)
 
-    def instrument_data(
-        self, symbols: List[str], granularities: List[Granularity],
-        time_from: dt.datetime, time_to: dt.datetime,
-    ) -> Iterator[InstrumentData]:
-        for instrument_meta in self.instrument_meta(symbols):
-            instrument_data = InstrumentData(instrument_meta)
-            for granularity in granularities:
-                instrument_data.add_timeframe(
-                    self.candles(
-                        instrument_meta.name, granularity, 'MBA', time_from, time_to,
-                    )
-                )
-            
-            yield instrument_data
+    def _get(self, url: str, params: dict) -> Dict:
+        # transient failures are retried with exponential backoff, every
+        # attempt waits for the rate limiter like a first request
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.wait()
+            retry_after = None
+
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status_code not in self.RETRY_STATUSES:
+                    return response.json()
+
+                if attempt == self.retries:
+                    response.raise_for_status()
+
+                retry_after = response.headers.get('Retry-After')
+
+            delay = self.backoff * 2 ** attempt
+            if retry_after is not None and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+
+            time.sleep(delay)
 
     def _get_headers(self) -> Dict[str, str]:
         return {
@@ -134,27 +293,32 @@ class Client:
             'Content-Type': 'application/json'
         }
     
-    @staticmethod           
-    def _parquet_candle(
-        symbol: str, granularity: Granularity, price: str,
-        period_start: dt.datetime, period_length: int
-    ) -> Tuple[str, str, str]:
-        directory = f'../data/{symbol}/{granularity}/{period_length}'
-
-        if granularity < Granularity.H1:
-            directory = f'{directory}/{period_start.year}'
-
-            if granularity < Granularity.M1:
-                directory = f'{directory}/{period_start.month}'
-
-        parquet_name = f'{symbol}_{granularity}_{period_length}_{period_start}'
-        parquet_name = parquet_name \
-            .replace('.', '-') \
-            .replace(' ', '-') \
-            .replace(':', '-') \
-            .lower() \
-            
-        full_path = f'{directory}/{parquet_name}.parquet'
-
-        return parquet_name, directory, full_path
-    
\ No newline at end of file
+    @staticmethod
+    def _parse_candles(raw_candles: List[Dict]) -> pd.DataFrame:
+        # column-wise: the strings of every candle are gathered per field
+        # and converted in one call instead of per candle
+        count = len(raw_candles)
+
+        columns = {
+            'time': pd.to_datetime(
+                [raw_candle['time'] for raw_candle in raw_candles], utc=True, format='ISO8601',
+            ),
+            'volume': np.fromiter(
+                (raw_candle['volume'] for raw_candle in raw_candles), dtype=np.int64, count=count,
+            ),
+            'complete': np.fromiter(
+                (raw_candle['complete'] for raw_candle in raw_candles), dtype=bool, count=count,
+            ),
+        }
+
+        ohlc = itemgetter('o', 'h', 'l', 'c')
+
+        for price in ['mid', 'bid', 'ask']:
+            values = np.array(
+                [ohlc(raw_candle[price]) for raw_candle in raw_candles], dtype=np.float64,
+            ).reshape(count, 4)
+
+            for index, oh in enumerate(['o', 'h', 'l', 'c']):
+                columns[f'{price}_{oh}'] = values[:, index]
+
+        return pd.DataFrame(columns)
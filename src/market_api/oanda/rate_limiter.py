@@ -0,0 +1,25 @@
+import threading
+import time
+
+
+class RateLimiter:
+
+    interval: float
+    next_time: float
+    lock: threading.Lock
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1 / requests_per_second
+        self.next_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        # every caller reserves the next free slot, requests are spaced
+        # evenly across threads instead of bursting
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_time, now)
+            self.next_time = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
@@ -1,10 +1,16 @@
 from typing import Dict, Any
-from market_api.candle import Candle
+from market_api.candle import Candle, CandleView
+from market_api.timeframe_arrays import TimeframeArrays
 import datetime as dt
 
 
 class Row:
 
+    __slots__ = (
+        'time', 'data', 'volume', 'complete', 'delayed', 
+        'ask', 'bid', 'mid',
+    )
+
     time: dt.datetime
     data: Dict[str, Any]
 
@@ -44,4 +50,66 @@ class Row:
             raise ValueError(f'Field {field} not found')
         
         return self.data[field]
-    
\ No newline at end of file
+    
+
+class RowView(Row):
+
+    __slots__ = ('arrays', 'position', '_ask', '_bid', '_mid')
+
+    arrays: TimeframeArrays
+    position: int
+
+    def __init__(self, arrays: TimeframeArrays, position: int, delayed: bool = False):
+        self.arrays = arrays
+        self.position = position
+        self.delayed = delayed
+
+        self._ask = None
+        self._bid = None
+        self._mid = None
+
+    def __reduce__(self):
+        return Row, (self.time, self.data, self.delayed)
+
+    @property
+    def time(self) -> dt.datetime:
+        return self.arrays.time_at(self.position)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        return self.arrays.row_data(self.position)
+
+    @property
+    def volume(self) -> int:
+        return self.field('volume')
+
+    @property
+    def complete(self) -> bool:
+        return self.field('complete')
+
+    @property
+    def ask(self) -> Candle:
+        if self._ask is None:
+            self._ask = CandleView(self.arrays.candle_columns('ask'), self.position)
+
+        return self._ask
+
+    @property
+    def bid(self) -> Candle:
+        if self._bid is None:
+            self._bid = CandleView(self.arrays.candle_columns('bid'), self.position)
+
+        return self._bid
+
+    @property
+    def mid(self) -> Candle:
+        if self._mid is None:
+            self._mid = CandleView(self.arrays.candle_columns('mid'), self.position)
+
+        return self._mid
+
+    def field(self, field: str) -> Any:
+        if field not in self.arrays.columns:
+            raise ValueError(f'Field {field} not found')
+
+        return self.arrays.columns[field].item(self.position)
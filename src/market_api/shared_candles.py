@@ -0,0 +1,168 @@
+from typing import Dict, List, Tuple
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing import resource_tracker
+from market_api.granularity import Granularity
+from market_api.instrument_meta import InstrumentMeta
+from market_api.instrument_data import InstrumentData
+from market_api.timeframe import Timeframe
+import numpy as np
+import pandas as pd
+import sys
+
+
+class SharedArray:
+
+    name: str
+    dtype: str
+    length: int
+
+    def __init__(self, name: str, dtype: str, length: int):
+        self.name = name
+        self.dtype = dtype
+        self.length = length
+
+    def attach(self) -> Tuple[SharedMemory, np.ndarray]:
+        # only the owner tracks the segment, a tracked attach would unlink
+        # it or report it as leaked when the attaching process exits
+        if sys.version_info >= (3, 13):
+            memory = SharedMemory(self.name, track=False)
+        else:
+            memory = SharedMemory(self.name)
+            resource_tracker.unregister(memory._name, 'shared_memory')
+        array = np.ndarray((self.length,), np.dtype(self.dtype), memory.buf)
+
+        return memory, array
+
+
+class SharedTimeframe:
+
+    symbol: str
+    granularity: Granularity
+    times: SharedArray
+    columns: Dict[str, SharedArray]
+
+    def __init__(
+        self, symbol: str, granularity: Granularity,
+        times: SharedArray, columns: Dict[str, SharedArray],
+    ):
+        self.symbol = symbol
+        self.granularity = granularity
+        self.times = times
+        self.columns = columns
+
+
+class SharedInstrument:
+
+    instrument_meta: InstrumentMeta
+    timeframes: List[SharedTimeframe]
+
+    def __init__(self, instrument_meta: InstrumentMeta):
+        self.instrument_meta = instrument_meta
+        self.timeframes = []
+
+
+class SharedCandleStore:
+
+    instruments: List[SharedInstrument]
+
+    _memory: List[SharedMemory]
+    _owner: bool
+
+    def __init__(self):
+        self.instruments = []
+
+        self._memory = []
+        self._owner = False
+
+    def __enter__(self) -> 'SharedCandleStore':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getstate__(self) -> Dict:
+        return {'instruments': self.instruments}
+
+    def __setstate__(self, state: Dict):
+        self.instruments = state['instruments']
+
+        self._memory = []
+        self._owner = False
+
+    def publish(self, instrument_data: InstrumentData):
+        self._owner = True
+        shared_instrument = SharedInstrument(instrument_data.instrument_meta)
+
+        for timeframe in instrument_data.timeframes.values():
+            arrays = timeframe.get_arrays()
+
+            columns = {}
+            for name, column in arrays.columns.items():
+                if column.dtype.kind not in 'biuf':
+                    raise ValueError(
+                        f'Column {name} of {timeframe.symbol} {timeframe.granularity} '
+                        f'has unsupported dtype {column.dtype}'
+                    )
+
+                columns[name] = self._publish_array(column)
+
+            shared_instrument.timeframes.append(SharedTimeframe(
+                timeframe.symbol, timeframe.granularity,
+                self._publish_array(arrays.times), columns,
+            ))
+
+        self.instruments.append(shared_instrument)
+
+    def attach(self) -> List[InstrumentData]:
+        instruments = []
+
+        for shared_instrument in self.instruments:
+            instrument_data = InstrumentData(shared_instrument.instrument_meta)
+
+            for shared_timeframe in shared_instrument.timeframes:
+                times = self._attach_array(shared_timeframe.times)
+                columns = {
+                    name: self._attach_array(shared_array)
+                    for name, shared_array in shared_timeframe.columns.items()
+                }
+
+                data = pd.DataFrame(
+                    columns, index=pd.to_datetime(times, utc=True), copy=False
+                )
+                data.index.name = 'time'
+
+                instrument_data.add_timeframe(Timeframe(
+                    shared_timeframe.symbol, shared_timeframe.granularity, data,
+                ))
+
+            instruments.append(instrument_data)
+
+        return instruments
+
+    def close(self):
+        for memory in self._memory:
+            memory.close()
+
+            if self._owner:
+                # workers sharing the tracker dropped the registration
+                if sys.version_info < (3, 13):
+                    resource_tracker.register(memory._name, 'shared_memory')
+
+                memory.unlink()
+
+        self._memory = []
+
+    def _publish_array(self, array: np.ndarray) -> SharedArray:
+        memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._memory.append(memory)
+
+        shared = np.ndarray(array.shape, array.dtype, memory.buf)
+        shared[:] = array
+
+        return SharedArray(memory.name, array.dtype.str, len(array))
+
+    def _attach_array(self, shared_array: SharedArray) -> np.ndarray:
+        memory, array = shared_array.attach()
+        self._memory.append(memory)
+
+        return array
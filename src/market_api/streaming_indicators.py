@@ -0,0 +1,255 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+from collections import deque
+import numpy as np
+import pandas as pd
+import math
+
+
+class AStreamingIndicator(ABC):
+
+    name: str
+    columns: Tuple[str, ...]
+
+    @property
+    @abstractmethod
+    def outputs(self) -> Dict[str, float]:
+        pass
+
+    @abstractmethod
+    def update(self, *values: float):
+        pass
+
+    @abstractmethod
+    def reset(self):
+        pass
+
+
+class RollingWindow:
+
+    period: int
+    window: deque
+
+    _shift: float
+    _sum: float
+    _sum_squares: float
+    _updates: int
+
+    def __init__(self, period: int):
+        self.period = period
+        self.reset()
+
+    def __len__(self) -> int:
+        return len(self.window)
+
+    def reset(self):
+        self.window = deque(maxlen=self.period)
+
+        self._shift = math.nan
+        self._sum = 0.0
+        self._sum_squares = 0.0
+        self._updates = 0
+
+    def push(self, value: float):
+        # sums are kept around the first value to avoid cancellation and
+        # recomputed once per period so rounding errors cannot accumulate
+        if math.isnan(self._shift):
+            self._shift = value
+
+        if len(self.window) == self.period:
+            dropped = self.window[0] - self._shift
+            self._sum -= dropped
+            self._sum_squares -= dropped * dropped
+
+        self.window.append(value)
+
+        shifted = value - self._shift
+        self._sum += shifted
+        self._sum_squares += shifted * shifted
+
+        self._updates += 1
+        if self._updates % self.period == 0:
+            self._recompute()
+
+    @property
+    def full(self) -> bool:
+        return len(self.window) == self.period
+
+    @property
+    def mean(self) -> float:
+        return self._shift + self._sum / len(self.window)
+
+    @property
+    def std(self) -> float:
+        count = len(self.window)
+        variance = (self._sum_squares - self._sum * self._sum / count) / (count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def _recompute(self):
+        self._shift = self.window[0]
+        self._sum = 0.0
+        self._sum_squares = 0.0
+
+        for value in self.window:
+            shifted = value - self._shift
+            self._sum += shifted
+            self._sum_squares += shifted * shifted
+
+
+class MovingAverage(AStreamingIndicator):
+
+    period: int
+    rolling: RollingWindow
+
+    def __init__(self, column: str, period: int, name: str = None):
+        self.name = f'ma_{column}_{period}' if name is None else name
+        self.columns = (column,)
+        self.period = period
+        self.rolling = RollingWindow(period)
+
+    @property
+    def outputs(self) -> Dict[str, float]:
+        return {self.name: self.rolling.mean if self.rolling.full else math.nan}
+
+    def update(self, value: float):
+        self.rolling.push(value)
+
+    def reset(self):
+        self.rolling.reset()
+
+
+class RollingStd(AStreamingIndicator):
+
+    period: int
+    rolling: RollingWindow
+
+    def __init__(self, column: str, period: int, name: str = None):
+        self.name = f'std_{column}_{period}' if name is None else name
+        self.columns = (column,)
+        self.period = period
+        self.rolling = RollingWindow(period)
+
+    @property
+    def outputs(self) -> Dict[str, float]:
+        return {self.name: self.rolling.std if self.rolling.full else math.nan}
+
+    def update(self, value: float):
+        self.rolling.push(value)
+
+    def reset(self):
+        self.rolling.reset()
+
+
+class ExponentialMovingAverage(AStreamingIndicator):
+
+    period: int
+    alpha: float
+
+    _value: float
+
+    def __init__(self, column: str, period: int, name: str = None):
+        self.name = f'ema_{column}_{period}' if name is None else name
+        self.columns = (column,)
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self._value = math.nan
+
+    @property
+    def outputs(self) -> Dict[str, float]:
+        return {self.name: self._value}
+
+    def update(self, value: float):
+        if math.isnan(self._value):
+            self._value = value
+        else:
+            self._value += self.alpha * (value - self._value)
+
+    def reset(self):
+        self._value = math.nan
+
+
+class BollingerBands(AStreamingIndicator):
+
+    period: int
+    std: float
+    rolling: RollingWindow
+
+    def __init__(self, price_type: str, period: int, std: float, name: str = None):
+        self.name = f'bb_{price_type}_{period}' if name is None else name
+        self.columns = tuple(f'{price_type}_{phase}' for phase in ('h', 'l', 'c'))
+        self.period = period
+        self.std = std
+        self.rolling = RollingWindow(period)
+
+    @property
+    def outputs(self) -> Dict[str, float]:
+        if not self.rolling.full:
+            ma = up = lo = math.nan
+        else:
+            ma = self.rolling.mean
+            deviation = self.rolling.std * self.std
+            up, lo = ma + deviation, ma - deviation
+
+        return {f'{self.name}_ma': ma, f'{self.name}_up': up, f'{self.name}_lo': lo}
+
+    def update(self, high: float, low: float, close: float):
+        self.rolling.push((high + low + close) / 3)
+
+    def reset(self):
+        self.rolling.reset()
+
+
+class StreamingIndicators:
+
+    frame: pd.DataFrame
+    position: int
+
+    indicators: List[AStreamingIndicator]
+    inputs: List[Tuple[np.ndarray, ...]]
+    values: Dict[str, np.ndarray]
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.position = -1
+
+        self.indicators = []
+        self.inputs = []
+        self.values = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.values
+
+    def register(self, indicator: AStreamingIndicator):
+        if all(name in self.values for name in indicator.outputs):
+            return
+
+        self.indicators.append(indicator)
+        self.inputs.append(tuple(
+            self.frame[column].to_numpy(dtype=np.float64) for column in indicator.columns
+        ))
+
+        for name in indicator.outputs:
+            self.values[name] = np.full(len(self.frame), np.nan)
+
+        # a late indicator catches up with the ones already streamed
+        indicator.reset()
+
+        for position in range(self.position + 1):
+            indicator.update(*(column.item(position) for column in self.inputs[-1]))
+            self._store(indicator, position)
+
+    def advance(self, position: int):
+        while self.position < position:
+            self.position += 1
+
+            for indicator, inputs in zip(self.indicators, self.inputs):
+                indicator.update(*(column.item(self.position) for column in inputs))
+                self._store(indicator, self.position)
+
+    def value(self, name: str, position: int) -> float:
+        self.advance(position)
+        return self.values[name].item(position)
+
+    def _store(self, indicator: AStreamingIndicator, position: int):
+        for name, value in indicator.outputs.items():
+            self.values[name][position] = value
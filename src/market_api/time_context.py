@@ -1,10 +1,12 @@
-from typing import Iterator, Dict, Any
+from typing import Iterator, Dict, Any, Optional
 from dask import dataframe as dd
 import datetime as dt
 from simulator.exceptions import TickDataError, TickCurrentCandleError
 from market_api.granularity import Granularity
 from market_api.row_set import RowSet
-from market_api.row import Row
+from market_api.row import Row, RowView
+from market_api.timeframe_arrays import TimeframeArrays
+from market_api.streaming_indicators import AStreamingIndicator, StreamingIndicators
 import pandas as pd
 
 
@@ -13,22 +15,30 @@ class TimeContext:
     symbol: str
     granularity: Granularity
     time: dt.datetime
+    horizon: dt.datetime
     history: dd.DataFrame
+    streaming: Optional[StreamingIndicators]
 
     _current: Row
     _latest: Row
+    _closed: Row
     
     def __init__(
         self, symbol: str, granularity: Granularity, 
-        ddf: dd.DataFrame, time: dt.datetime
+        ddf: dd.DataFrame, time: dt.datetime,
+        horizon: Optional[dt.datetime] = None,
+        streaming: Optional[StreamingIndicators] = None,
     ):
         self.symbol = symbol
         self.granularity = granularity
         self.time = time
+        self.horizon = time if horizon is None else horizon
         self.history = ddf.loc[:time]
+        self.streaming = streaming
 
         self._current = None
         self._latest = None
+        self._closed = None
 
     @property
     def current(self) -> Row:
@@ -56,6 +66,30 @@ class TimeContext:
 
         return self._latest
 
+    @property
+    def closed(self) -> Row:
+        if self._closed is None:
+            position = self._closed_position()
+
+            if position < 0:
+                raise TickDataError(self.symbol, self.granularity)
+            
+            row_data = self.history.iloc[position]
+            self._closed = Row(row_data.name, row_data.to_dict(), row_data.name != self.time)
+
+        return self._closed
+
+    def register(self, indicator: AStreamingIndicator):
+        self.streaming.register(indicator)
+
+    def indicator(self, name: str, closed: bool = False) -> float:
+        position = self._closed_position() if closed else self._latest_position()
+
+        if position < 0:
+            raise TickDataError(self.symbol, self.granularity)
+
+        return self.streaming.value(name, position)
+
     def latest_df(self, n: int) -> dd.DataFrame:
         return self.history.loc[self._time_latest_n(n):]
     
@@ -64,4 +98,90 @@ class TimeContext:
     
     def _time_latest_n(self, n: int):
         return self.time - n * self.granularity.time_delta
-    
\ No newline at end of file
+
+    def _latest_position(self) -> int:
+        return len(self.history) - 1
+
+    def _closed_position(self) -> int:
+        candle_ends = self.history.index + self.granularity.time_delta
+        return candle_ends.searchsorted(self.horizon, 'right') - 1
+    
+
+class CursorTimeContext(TimeContext):
+
+    arrays: TimeframeArrays
+    position: int
+    closed_position: int
+    time_value: int
+
+    _history: pd.DataFrame
+
+    def __init__(
+        self, arrays: TimeframeArrays, position: int, closed_position: int,
+        time: dt.datetime, time_value: int, horizon: dt.datetime,
+        streaming: Optional[StreamingIndicators] = None,
+    ):
+        self.symbol = arrays.symbol
+        self.granularity = arrays.granularity
+        self.time = time
+        self.horizon = horizon
+
+        self.arrays = arrays
+        self.position = position
+        self.closed_position = closed_position
+        self.time_value = time_value
+        self.streaming = streaming
+
+        self._history = None
+        self._current = None
+        self._latest = None
+        self._closed = None
+
+    @property
+    def history(self) -> pd.DataFrame:
+        if self._history is None:
+            self._history = self.arrays.frame.iloc[:self.position + 1]
+
+        return self._history
+
+    @property
+    def current(self) -> Row:
+        if self._current is None:
+            if self.position < 0 or self.arrays.times[self.position] != self.time_value:
+                raise TickCurrentCandleError(self.symbol, self.granularity)
+
+            self._current = RowView(self.arrays, self.position)
+
+        return self._current
+
+    @property
+    def latest(self) -> Row:
+        if self._latest is None:
+            if self.position < 0:
+                raise TickDataError(self.symbol, self.granularity)
+
+            self._latest = RowView(
+                self.arrays, self.position,
+                self.arrays.times[self.position] != self.time_value,
+            )
+
+        return self._latest
+
+    @property
+    def closed(self) -> Row:
+        if self._closed is None:
+            if self.closed_position < 0:
+                raise TickDataError(self.symbol, self.granularity)
+
+            self._closed = RowView(
+                self.arrays, self.closed_position,
+                self.arrays.times[self.closed_position] != self.time_value,
+            )
+
+        return self._closed
+
+    def _latest_position(self) -> int:
+        return self.position
+
+    def _closed_position(self) -> int:
+        return self.closed_position
@@ -1,9 +1,13 @@
+from typing import Optional
 import pandas as pd
 import datetime as dt
 from market_api.granularity import Granularity
 from market_api.indicators import IndicatorsMixin
 from plotting.candle_plot import CandlePlot
 from market_api.time_context import TimeContext
+from market_api.timeframe_arrays import TimeframeArrays
+from market_api.timeframe_cursor import TimeframeCursor
+from market_api.streaming_indicators import AStreamingIndicator, StreamingIndicators
 import dask.dataframe as dd
 from dask_expr._collection import Scalar
 import pytz
@@ -13,29 +17,31 @@ class Timeframe(IndicatorsMixin):
 
     symbol: str
     granularity: Granularity
-    data: dd.DataFrame
+    data: pd.DataFrame
     start: dt.datetime
     end: dt.datetime
+    streaming: StreamingIndicators
 
     def __init__(
         self, symbol: str,
         granularity: Granularity, 
-        data: dd.DataFrame
+        data: dd.DataFrame | pd.DataFrame
     ):
         self._init_indicators()
 
         self.symbol = symbol
         self.granularity = granularity
         
-        self.data = data
+        if isinstance(data, dd.DataFrame):
+            data = data.compute()
 
-        if len(self.data) > 0:
-            self.data = self.data.set_index('time', sorted=True)
-        
-        self.data = self.data.compute()
+        if 'time' in data.columns:
+            data = data.set_index('time')
 
-        self.start = data.time.min().compute()
-        self.end = data.time.max().compute()
+        self.data = data
+        self.start = data.index.min()
+        self.end = data.index.max()
+        self.streaming = StreamingIndicators(self.data)
 
     def __repr__(self):
         return self.__str__()
@@ -46,8 +52,21 @@ class Timeframe(IndicatorsMixin):
     def __hash__(self) -> int:
         return hash((self.granularity, self.start, self.end))
     
-    def get_context(self, time: dt.datetime) -> TimeContext:
-        return TimeContext(self.symbol, self.granularity, self.data, time)
+    def get_context(
+        self, time: dt.datetime, horizon: Optional[dt.datetime] = None
+    ) -> TimeContext:
+        return TimeContext(
+            self.symbol, self.granularity, self.data, time, horizon, self.streaming
+        )
+
+    def add_streaming(self, indicator: AStreamingIndicator):
+        self.streaming.register(indicator)
+    
+    def get_arrays(self) -> TimeframeArrays:
+        return TimeframeArrays.from_frame(self.symbol, self.granularity, self.data)
+    
+    def get_cursor(self) -> TimeframeCursor:
+        return TimeframeCursor(self.get_arrays(), self.streaming)
     
     def get_candle_plot(self, index_from: dt.datetime, index_to: dt.datetime) -> CandlePlot:
         plot = CandlePlot(self.symbol, self.data.loc[index_from:index_to])
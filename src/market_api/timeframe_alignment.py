@@ -0,0 +1,27 @@
+from market_api.timeframe_arrays import TimeframeArrays
+import numpy as np
+
+
+class TimeframeAlignment:
+
+    main: TimeframeArrays
+    other: TimeframeArrays
+
+    ends: np.ndarray
+    closed: np.ndarray
+
+    def __init__(self, main: TimeframeArrays, other: TimeframeArrays):
+        self.main = main
+        self.other = other
+
+        # a candle is closed once it ends within the main candle of the step
+        self.ends = other.times + TimeframeArrays.delta_value(other.granularity)
+        main_ends = main.times + TimeframeArrays.delta_value(main.granularity)
+
+        self.closed = np.searchsorted(self.ends, main_ends, 'right') - 1
+
+    def closed_position(self, main_position: int, on_main: bool, horizon_value: int) -> int:
+        if on_main:
+            return int(self.closed[main_position])
+
+        return int(np.searchsorted(self.ends, horizon_value, 'right')) - 1
@@ -0,0 +1,72 @@
+from typing import Dict, Tuple
+from market_api.granularity import Granularity
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+
+class TimeframeArrays:
+
+    symbol: str
+    granularity: Granularity
+    frame: pd.DataFrame
+
+    times: np.ndarray
+    columns: Dict[str, np.ndarray]
+
+    _candle_columns: Dict[str, Tuple[np.ndarray, ...]]
+
+    def __init__(
+        self, symbol: str, granularity: Granularity, 
+        frame: pd.DataFrame, times: np.ndarray, 
+        columns: Dict[str, np.ndarray],
+    ):
+        self.symbol = symbol
+        self.granularity = granularity
+        self.frame = frame
+
+        self.times = times
+        self.columns = columns
+
+        self._candle_columns = {}
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def position(self, time: dt.datetime) -> int:
+        return int(np.searchsorted(self.times, self.time_value(time), 'right')) - 1
+    
+    def row_data(self, position: int) -> Dict:
+        return {name: column.item(position) for name, column in self.columns.items()}
+    
+    def candle_columns(self, price: str) -> Tuple[np.ndarray, ...]:
+        if price not in self._candle_columns:
+            self._candle_columns[price] = tuple(
+                self.columns[f'{price}_{phase}'] for phase in 'ochl'
+            )
+
+        return self._candle_columns[price]
+
+    def time_at(self, position: int) -> pd.Timestamp:
+        return self.frame.index[position]
+
+    @staticmethod
+    def time_value(time: dt.datetime) -> int:
+        return pd.Timestamp(time).value
+
+    @staticmethod
+    def delta_value(granularity: Granularity) -> int:
+        return pd.Timedelta(granularity.time_delta).value
+
+    @staticmethod
+    def from_frame(
+        symbol: str, granularity: Granularity, frame: pd.DataFrame
+    ) -> 'TimeframeArrays':
+        times = np.asarray(frame.index.asi8, dtype=np.int64)
+
+        columns = {
+            name: frame[name].to_numpy()
+            for name in frame.columns
+        }
+
+        return TimeframeArrays(symbol, granularity, frame, times, columns)
@@ -0,0 +1,48 @@
+from market_api.timeframe_arrays import TimeframeArrays
+from market_api.time_context import CursorTimeContext
+from market_api.streaming_indicators import StreamingIndicators
+from typing import Optional
+import datetime as dt
+import numpy as np
+
+
+class TimeframeCursor:
+
+    arrays: TimeframeArrays
+    position: int
+    streaming: Optional[StreamingIndicators]
+
+    def __init__(
+        self, arrays: TimeframeArrays, 
+        streaming: Optional[StreamingIndicators] = None,
+    ):
+        self.arrays = arrays
+        self.position = -1
+        self.streaming = streaming
+
+    def seek(self, time_value: int) -> int:
+        times = self.arrays.times
+        position = self.position
+
+        if position + 1 < len(times) and times[position + 1] <= time_value:
+            if position + 2 >= len(times) or times[position + 2] > time_value:
+                position += 1
+            else:
+                position = int(np.searchsorted(times, time_value, 'right')) - 1
+        elif position >= 0 and times[position] > time_value:
+            position = int(np.searchsorted(times, time_value, 'right')) - 1
+
+        self.position = position
+        return position
+    
+    def reset(self):
+        self.position = -1
+
+    def get_context(
+        self, time: dt.datetime, time_value: int, 
+        closed_position: int, horizon: dt.datetime,
+    ) -> CursorTimeContext:
+        return CursorTimeContext(
+            self.arrays, self.seek(time_value), closed_position, 
+            time, time_value, horizon, self.streaming,
+        )
@@ -10,6 +10,7 @@ from simulator.watch_list import WatchList
 from simulator.lot import Lot
 from market_api.currency import Currency
 from market_api.granularity import Granularity
+from market_api.oanda.client import Client
 import datetime as dt
 from dotenv import load_dotenv
 import os
@@ -34,11 +35,13 @@ load_dotenv("../.env")
 
 play_account = Account(50000, Currency.USD)
 
-simulator = Simulator(
-    play_account, os.environ.get("OANDA_ID"), 
+market_api = Client(
+    os.environ.get("OANDA_ID"), 
     os.environ.get("OANDA_API_KEY"),
 )
 
+simulator = Simulator(play_account, market_api)
+
 simulator.refresh_per_second = 10
 
 simulator.add_controller(SimulationController())
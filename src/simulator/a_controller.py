@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from typing import Any, Optional
+from market_api.granularity import Granularity
 from simulator.context import Context
 from simulator.account import Account
 from simulator.watch_list import WatchList
@@ -7,7 +9,14 @@ from simulator.watch_list import WatchList
 class AController(ABC):
 
     steps_count: int
+    heartbeat: Optional[Granularity] = None
     
     @abstractmethod
     def tick(self, step: int, context: Context, account: Account, watch_list: WatchList) -> str:
         pass
+
+    def checkpoint_state(self) -> Any:
+        return None
+
+    def restore_state(self, state: Any):
+        pass
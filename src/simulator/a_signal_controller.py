@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from market_api.instrument_data import InstrumentData
+from simulator.lot import Lot
+import pandas as pd
+
+
+class ASignalController(ABC):
+
+    symbol: str
+    lot: Lot = Lot.MICRO
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+
+    # one row per candle of the main timeframe with columns direction
+    # (1 long, -1 short, 0 none) and optionally count, stop_loss,
+    # take_profit and exit (close all running positions first)
+    @abstractmethod
+    def signals(self, instrument_data: InstrumentData) -> pd.DataFrame:
+        pass
@@ -1,11 +1,15 @@
 import datetime as dt
 from typing import List, Dict, Optional
+from itertools import islice
 from market_api.currency import Currency
 from simulator.instrument_context import InstrumentContext
 from simulator.position import Position
+from simulator.position_book import PositionBook
+from simulator.intrabar_resolver import IntrabarResolver
 from simulator.direction import Direction
 from simulator.context import Context
 from simulator.lot import Lot
+from simulator.trade_journal import TradeJournal
 
 from simulator.exceptions import (
     BalanceTooLowError, 
@@ -21,47 +25,69 @@ class Account:
     currency: Currency
     contexxt: Optional[Context]
 
-    positions_index: Dict[str, Position]
+    position_books: Dict[str, PositionBook]
 
-    positions_running: List[Position]
-    positions_closed: List[Position]
+    running: Dict[int, Position]
+    journal: TradeJournal
+
+    intrabar_resolver: Optional[IntrabarResolver]
 
     _payback_running: float
+    _payback_rounded: float
+    _equity: float
 
-    def __init__(self, balance: float, currency: Currency):
-        self._balance = balance
+    def __init__(
+        self, balance: float, currency: Currency,
+        journal_directory: Optional[str] = None,
+    ):
         self.currency = currency
         self.context = None
 
-        self.positions_index = {}
-        self.positions_running = []
-        self.positions_closed = []
+        self.position_books = {}
+        self.running = {}
+        self.journal = TradeJournal(journal_directory)
+
+        self.intrabar_resolver = None
 
         self._payback_running = 0
+        self._payback_rounded = 0
+        self.balance = balance
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, 'context': None, 'intrabar_resolver': None}
 
     @property
     def balance(self) -> float:
-        return self.currency.round(self._balance)
+        return self._balance
     
     @balance.setter
     def balance(self, value: float):
         self._balance = self.currency.round(value)
+        self._equity = self.currency.round(self._balance + self._payback_running)
 
     @property
     def payback_running(self) -> float:
-        return self.currency.round(self._payback_running)
+        return self._payback_rounded
     
     @property
     def equity(self) -> float:
-        return self.currency.round(self.balance + self._payback_running)
+        return self._equity
+    
+    @property
+    def positions_running(self) -> List[Position]:
+        return list(self.running.values())
     
     @property
     def count_running(self) -> int:
-        return len(self.positions_running)
+        return len(self.running)
     
+    @property
+    def positions_closed(self) -> List[Position]:
+        return list(self.journal.recent.values())
+
     @property
     def count_closed(self) -> int:
-        return len(self.positions_closed)
+        return self.journal.count
 
     def position_open(
         self, instrument: str, 
@@ -83,12 +109,20 @@ class Account:
         
         self.balance -= margin_required
 
-        self.positions_index[position.id] = position
-        self.positions_running.append(position)
+        self.running[position.id] = position
+
+        if instrument not in self.position_books:
+            self.position_books[instrument] = PositionBook(
+                instrument_context.instrument_meta, 
+                resolver=self.intrabar_resolver,
+            )
+
+        self.position_books[instrument].add(position, instrument_context)
+        self._refresh_payback()
 
         return position
     
-    def position_close(self, position_id: str) -> Position:
+    def position_close(self, position_id: int) -> Position:
         position = self.position_get(position_id)
 
         if not position.running:
@@ -96,29 +130,52 @@ class Account:
 
         position.close(self.context)
         self._resolve_closed(position)
+        self._refresh_payback()
 
         return position
 
-    def position_get(self, position_id: str) -> Position:
-        if position_id not in self.positions_index.keys():
+    def position_get(self, position_id: int) -> Position:
+        position = self.running.get(position_id) or self.journal.get(position_id)
+
+        if position is None:
             raise PositionNotFoudError(position_id)
         
-        return self.positions_index[position_id]
+        return position
     
+    def positions_running_latest(self, n: int) -> List[Position]:
+        latest = list(islice(reversed(self.running.values()), n))
+        latest.reverse()
+        return latest
+
+    def restore(self, account: 'Account'):
+        intrabar_resolver = self.intrabar_resolver
+        self.__dict__.update(account.__dict__)
+
+        self.intrabar_resolver = intrabar_resolver
+        for book in self.position_books.values():
+            book.resolver = intrabar_resolver
+
     def refresh(self, context: Context):
         self.context = context
-        self._payback_running = 0
-
-        for position in self.positions_running:
-            position.refresh(context)
 
-            if position.running:
-                self._payback_running += position.payback_convert(self.currency)
-            else:
+        for book in self.position_books.values():
+            for position in book.refresh(context):
                 self._resolve_closed(position)
 
+        self._refresh_payback()
+
+    def _refresh_payback(self):
+        self._payback_running = sum(
+            book.payback(self.currency) for book in self.position_books.values()
+        )
+
+        self._payback_rounded = self.currency.round(self._payback_running)
+        self._equity = self.currency.round(self._balance + self._payback_running)
+
     def _resolve_closed(self, position: Position):
-        self.positions_running.remove(position)
-        self.positions_closed.append(position)
+        self.position_books[position.instrument.name].remove(position)
+
+        del self.running[position.id]
+        self.journal.append(position, self.currency)
 
         self.balance += position.payback_convert(self.currency)
@@ -0,0 +1,150 @@
+from typing import Any, Dict, List, Optional
+from enum import Enum
+from simulator.account import Account
+from simulator.exceptions import CheckpointMismatchError
+import datetime as dt
+import hashlib
+import threading
+import pickle
+import queue
+import gzip
+import glob
+import os
+
+
+class Checkpoint:
+
+    step: int
+    time: dt.datetime
+    account: Account
+    controllers: List[Any]
+    output: List[Dict[str, Any]]
+    position_id: int
+    fingerprint: Optional[str]
+
+    def __init__(
+        self, step: int, time: dt.datetime, account: Account,
+        controllers: List[Any], output: List[Dict[str, Any]], position_id: int,
+        fingerprint: Optional[str] = None,
+    ):
+        self.step = step
+        self.time = time
+        self.account = account
+        self.controllers = controllers
+        self.output = output
+        self.position_id = position_id
+        self.fingerprint = fingerprint
+
+
+class Checkpointer:
+
+    directory: str
+    every: int
+    keep: int
+    resume: bool
+    fingerprint: Optional[str]
+
+    _queue: queue.Queue
+    _writer: Optional[threading.Thread]
+
+    def __init__(self, directory: str, every: int = 10000, keep: int = 2, resume: bool = True):
+        self.directory = directory
+        self.every = every
+        self.keep = keep
+        self.resume = resume
+        self.fingerprint = None
+
+        self._queue = queue.Queue(maxsize=1)
+        self._writer = None
+
+    @staticmethod
+    def run_fingerprint(parts: List[Any]) -> str:
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    @staticmethod
+    def parameters(controller: Any) -> List[Any]:
+        # only plain values, anything else has no stable repr
+        plain = (int, float, str, bool, type(None), Enum, dt.datetime, dt.timedelta)
+
+        values = {}
+        for owner in reversed(type(controller).__mro__):
+            values.update(vars(owner))
+        values.update(vars(controller))
+
+        return sorted(
+            (name, value) for name, value in values.items()
+            if not name.startswith('_') and (
+                isinstance(value, plain) or (
+                    isinstance(value, (tuple, list)) and
+                    all(isinstance(item, plain) for item in value)
+                )
+            )
+        )
+
+    def due(self, step: int) -> bool:
+        return step > 0 and step % self.every == 0
+
+    def save(self, checkpoint: Checkpoint):
+        # pickle on the loop thread to capture a consistent state,
+        # compression and disk I/O happen on the writer thread
+        checkpoint.fingerprint = self.fingerprint
+        payload = pickle.dumps(checkpoint, pickle.HIGHEST_PROTOCOL)
+
+        if self._writer is None:
+            os.makedirs(self.directory, exist_ok=True)
+
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+
+        # the loop never waits on a slow write, a pending older
+        # snapshot is replaced by the newer one
+        while True:
+            try:
+                self._queue.put_nowait((checkpoint.step, payload))
+                break
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def latest(self) -> Optional[Checkpoint]:
+        paths = self._paths()
+
+        if not paths:
+            return None
+
+        with gzip.open(paths[-1], 'rb') as file:
+            checkpoint = pickle.load(file)
+
+        if checkpoint.fingerprint != self.fingerprint:
+            raise CheckpointMismatchError(self.directory)
+
+        return checkpoint
+
+    def close(self):
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+
+            if item is None:
+                break
+
+            step, payload = item
+            path = os.path.join(self.directory, f'checkpoint-{step:012d}.pkl.gz')
+
+            with gzip.open(f'{path}.tmp', 'wb', compresslevel=6) as file:
+                file.write(payload)
+
+            os.replace(f'{path}.tmp', path)
+
+            for stale in self._paths()[:-self.keep]:
+                os.remove(stale)
+
+    def _paths(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, 'checkpoint-*.pkl.gz')))
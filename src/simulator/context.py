@@ -21,8 +21,11 @@ class Context:
             self.time, instrument_data.instrument_meta
         )
 
+        # higher timeframes count as closed once they end within the main candle
+        horizon = self.time + instrument_data.timeframe_main.granularity.time_delta
+
         for timeframe in instrument_data.timeframes.values():
-            instrument_context.add_timeframe(timeframe)
+            instrument_context.add_timeframe(timeframe, horizon)
 
         self.instruments[instrument_data.instrument_meta.name] = instrument_context
         
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class Display(Enum):
+
+    LIVE = 'live'
+    THREADED = 'threaded'
+    HEADLESS = 'headless'
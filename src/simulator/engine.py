@@ -0,0 +1,117 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import Dict, List, Tuple
+from market_api.instrument_data import InstrumentData
+from market_api.instrument_meta import InstrumentMeta
+from market_api.timeframe_arrays import TimeframeArrays
+from market_api.timeframe_cursor import TimeframeCursor
+from market_api.timeframe_alignment import TimeframeAlignment
+from simulator.instrument_context import InstrumentContext
+from simulator.context import Context
+import datetime as dt
+
+
+class Engine(Enum):
+
+    PANDAS = 'pandas'
+    CURSOR = 'cursor'
+
+    def context_builder(self, instruments: Dict[str, InstrumentData]) -> 'AContextBuilder':
+        match self:
+            case Engine.PANDAS:
+                return PandasContextBuilder(instruments)
+            case Engine.CURSOR:
+                return CursorContextBuilder(instruments)
+            case _:
+                raise ValueError(f'Unexpected engine: {self.value}')
+
+
+class AContextBuilder(ABC):
+
+    instruments: Dict[str, InstrumentData]
+
+    def __init__(self, instruments: Dict[str, InstrumentData]):
+        self.instruments = instruments
+
+    @abstractmethod
+    def build(self, time: dt.datetime) -> Context:
+        pass
+
+
+class PandasContextBuilder(AContextBuilder):
+
+    def build(self, time: dt.datetime) -> Context:
+        context = Context(time)
+        for instrument in self.instruments.values():
+            context.add_instrument(instrument)
+
+        return context
+
+
+class CursorInstrument:
+
+    instrument_meta: InstrumentMeta
+    main: TimeframeCursor
+    main_delta_value: int
+    timeframes: List[Tuple[TimeframeCursor, TimeframeAlignment]]
+
+    def __init__(self, instrument: InstrumentData):
+        self.instrument_meta = instrument.instrument_meta
+        self.main = instrument.timeframe_main.get_cursor()
+        self.main_delta_value = TimeframeArrays.delta_value(instrument.timeframe_main.granularity)
+
+        self.timeframes = []
+
+        for timeframe in instrument.timeframes.values():
+            cursor = (
+                self.main if timeframe is instrument.timeframe_main
+                else timeframe.get_cursor()
+            )
+
+            self.timeframes.append((
+                cursor, TimeframeAlignment(self.main.arrays, cursor.arrays)
+            ))
+
+    def get_context(self, time: dt.datetime, time_value: int) -> InstrumentContext:
+        main_arrays = self.main.arrays
+        main_position = self.main.seek(time_value)
+        on_main = main_position >= 0 and main_arrays.times[main_position] == time_value
+
+        horizon = time + main_arrays.granularity.time_delta
+        horizon_value = time_value + self.main_delta_value
+
+        instrument_context = InstrumentContext(time, self.instrument_meta)
+
+        for cursor, alignment in self.timeframes:
+            closed_position = alignment.closed_position(
+                main_position, on_main, horizon_value
+            )
+
+            instrument_context.add_time_context(cursor.get_context(
+                time, time_value, closed_position, horizon
+            ))
+
+        return instrument_context
+
+
+class CursorContextBuilder(AContextBuilder):
+
+    cursors: List[CursorInstrument]
+
+    def __init__(self, instruments: Dict[str, InstrumentData]):
+        super().__init__(instruments)
+
+        self.cursors = [
+            CursorInstrument(instrument) for instrument in instruments.values()
+        ]
+
+    def build(self, time: dt.datetime) -> Context:
+        time_value = TimeframeArrays.time_value(time)
+        context = Context(time)
+
+        for cursor in self.cursors:
+            context.instruments[cursor.instrument_meta.name] = cursor.get_context(
+                time, time_value
+            )
+
+        return context
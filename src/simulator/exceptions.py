@@ -1,6 +1,5 @@
 import datetime as dt
 from market_api.granularity import Granularity
-import uuid
 
 
 class TickDataError(Exception):
@@ -17,19 +16,23 @@ class TickCurrentCandleError(Exception):
 
 class PositionAlreadyClosedError(Exception):
     
-    def __init__(self, position_id: uuid.UUID):
-        string_id = str(position_id)
-        super().__init__(f'Position {string_id} already closed')
+    def __init__(self, position_id: int):
+        super().__init__(f'Position {position_id} already closed')
 
 
 class PositionNotFoudError(Exception):
     
-    def __init__(self, position_id: uuid.UUID):
-        string_id = str(position_id)
-        super().__init__(f'Position {string_id} not found')
+    def __init__(self, position_id: int):
+        super().__init__(f'Position {position_id} not found')
 
 
 class BalanceTooLowError(Exception):
     
     def __init__(self, balance: float, margin: float):
         super().__init__(f'Balance {balance} too low for margin {margin}')
+
+
+class CheckpointMismatchError(Exception):
+
+    def __init__(self, directory: str):
+        super().__init__(f'Checkpoint in {directory} belongs to a different run')
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Optional
 from market_api.instrument_meta import InstrumentMeta
 from market_api.granularity import Granularity
 from market_api.time_context import TimeContext
@@ -39,15 +39,18 @@ class InstrumentContext:
             self.price.ask.close - self.price.bid.close
         )
 
-    def add_timeframe(self, time_frame: Timeframe):
-        time_context = time_frame.get_context(self.time)
+    def add_timeframe(self, time_frame: Timeframe, horizon: Optional[dt.datetime] = None):
+        self.add_time_context(time_frame.get_context(self.time, horizon))
 
+    def add_time_context(self, time_context: TimeContext):
         if time_context.symbol != self.instrument_meta.name:
             raise ValueError(
                 f'Symbol does not match: '
                 f'{time_context.symbol} != {self.instrument_meta.name}'
             )
         
+        self.timeframes[time_context.granularity] = time_context
+        
         if self.timeframe_main is None or (
             time_context.granularity < self.timeframe_main.granularity
         ):
@@ -0,0 +1,77 @@
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from market_api.candle import Candle, CandleView
+from market_api.granularity import Granularity
+from market_api.a_provider import AProvider
+from market_api.timeframe_arrays import TimeframeArrays
+import datetime as dt
+import numpy as np
+
+
+class IntrabarResolver:
+
+    market_api: AProvider
+    granularity: Granularity
+    cache_size: int
+
+    chunks: 'OrderedDict[Tuple[str, dt.datetime], TimeframeArrays]'
+
+    def __init__(
+        self, market_api: AProvider, 
+        granularity: Granularity = Granularity.S5, cache_size: int = 32,
+    ):
+        self.market_api = market_api
+        self.granularity = granularity
+        self.cache_size = cache_size
+
+        self.chunks = OrderedDict()
+
+    def fine_candles(
+        self, symbol: str, bar_granularity: Granularity, bar_time: dt.datetime,
+    ) -> List[Tuple[Candle, Candle]]:
+        if not self.granularity < bar_granularity:
+            return []
+
+        bar_end = bar_time + bar_granularity.time_delta
+        time_from = TimeframeArrays.time_value(bar_time)
+        time_to = TimeframeArrays.time_value(bar_end)
+
+        candles = []
+
+        for period_start, period_end in self.granularity.range_periods(
+            self.market_api.cache_candles, bar_time, bar_end
+        ):
+            arrays = self._chunk(symbol, period_start, period_end)
+
+            position_from = np.searchsorted(arrays.times, time_from, 'left')
+            position_to = np.searchsorted(arrays.times, time_to, 'left')
+
+            bid = arrays.candle_columns('bid')
+            ask = arrays.candle_columns('ask')
+
+            candles.extend(
+                (CandleView(bid, position), CandleView(ask, position))
+                for position in range(position_from, position_to)
+            )
+
+        return candles
+
+    def _chunk(
+        self, symbol: str, period_start: dt.datetime, period_end: dt.datetime,
+    ) -> TimeframeArrays:
+        key = (symbol, period_start)
+
+        if key in self.chunks:
+            self.chunks.move_to_end(key)
+            return self.chunks[key]
+
+        timeframe = self.market_api.candles(
+            symbol, self.granularity, 'MBA', period_start, period_end,
+        )
+
+        self.chunks[key] = timeframe.get_arrays()
+
+        if len(self.chunks) > self.cache_size:
+            self.chunks.popitem(last=False)
+
+        return self.chunks[key]
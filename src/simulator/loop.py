@@ -1,11 +1,17 @@
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Iterator
 from market_api.instrument_data import InstrumentData
 from market_api.granularity import Granularity
 from simulator.a_controller import AController
-from simulator.context import Context
 from simulator.account import Account
 from simulator.watch_list import WatchList
+from simulator.engine import Engine, AContextBuilder
+from simulator.stepping import Stepping
+from simulator.checkpoint import Checkpoint, Checkpointer
+from simulator.position import Position
+from simulator.profiler import Profiler, Phase
+from itertools import dropwhile
 import datetime as dt
+import itertools
 
 
 class Loop:
@@ -18,6 +24,9 @@ class Loop:
     time_min: Optional[dt.datetime]
     time_max: Optional[dt.datetime]
 
+    checkpointer: Optional[Checkpointer]
+    profiler: Optional[Profiler]
+
     def __init__(self, account: Account):
         self.account = account
 
@@ -27,6 +36,9 @@ class Loop:
         self.time_min = None
         self.time_max = None
 
+        self.checkpointer = None
+        self.profiler = None
+
     def add_instrument(self, instrument_data: InstrumentData):
         self.instruments[instrument_data.instrument_meta.name] = instrument_data
 
@@ -42,22 +54,55 @@ class Loop:
     def run(
         self, time_step: Granularity, 
         time_from: dt.datetime, time_to: dt.datetime,
-        after_tick: Callable,
+        after_tick: Callable, engine: Engine = Engine.PANDAS,
+        stepping: Stepping = Stepping.FIXED,
     ):
         realtime_start = dt.datetime.now()
+        context_builder = engine.context_builder(self.instruments)
 
-        time_range = time_to - time_from
-        steps_count = int(time_range / time_step.time_delta)
+        steps_count, step_times = stepping.steps(
+            self.instruments, time_step, time_from, time_to, self._heartbeat()
+        )
 
         for controller in self.controllers:
             controller.steps_count = steps_count
 
-        current_time = time_from
-        current_step = 0
-
         output = []
+        step_first = 0
+
+        if self.checkpointer is not None:
+            self.checkpointer.fingerprint = self._fingerprint(
+                time_step, time_from, time_to, engine, stepping
+            )
+
+        checkpoint = self._checkpoint_restore()
+        if checkpoint is not None:
+            output = checkpoint.output
+            step_first = checkpoint.step + 1
+            step_times = dropwhile(lambda time: time <= checkpoint.time, step_times)
+
+        if self.profiler is not None:
+            self.profiler.start()
+
+        try:
+            self._run_steps(
+                context_builder, step_times, step_first,
+                realtime_start, output, after_tick,
+            )
+        finally:
+            self.account.journal.flush()
+
+            if self.checkpointer is not None:
+                self.checkpointer.close()
+
+    def _run_steps(
+        self, context_builder: AContextBuilder, step_times: Iterator[dt.datetime],
+        step_first: int, realtime_start: dt.datetime,
+        output: List[Dict[str, Any]], after_tick: Callable,
+    ):
+        profiler = self.profiler
 
-        while current_time <= time_to:
+        for current_step, current_time in enumerate(step_times, step_first):
             currency = self.account.currency.name
             realtime_current = dt.datetime.now()
             duration = realtime_current - realtime_start
@@ -71,21 +116,42 @@ class Loop:
             watch_list.add('running', self.account.count_running)
             watch_list.add('closed', self.account.count_closed)
 
+            if profiler is not None:
+                started = profiler.clock()
+
+            error = None
+
             try:
-                context = Context(current_time)
-                for instrument in self.instruments.values():
-                    context.add_instrument(instrument)
+                context = context_builder.build(current_time)
+
+                if profiler is not None:
+                    started = profiler.add(Phase.CONTEXT, started)
 
                 self.account.refresh(context)
 
+                if profiler is not None:
+                    started = ticked = profiler.add(Phase.REFRESH, started)
+
                 result = 'N/A'
                 for controller in self.controllers:
                     result = controller.tick(
                         current_step, context, self.account, watch_list
                     )
 
+                    if profiler is not None:
+                        started = profiler.add_controller(
+                            controller.__class__.__name__, started
+                        )
+
+                if profiler is not None:
+                    profiler.phases[Phase.TICK].add(started - ticked)
+
             except Exception as exception:
-                result = f'[red]{exception.__class__.__name__}: {str(exception)}'
+                error = exception.__class__.__name__
+                result = f'[red]{error}: {str(exception)}'
+
+                if profiler is not None:
+                    profiler.add(Phase.EXCEPTION, started)
                     
             except KeyboardInterrupt:
                 print('Simulation stopped by user')
@@ -95,13 +161,77 @@ class Loop:
                 output.append({
                     'step': current_step,
                     'time': current_time,
-                    'result': result
+                    'result': result,
+                    'error': error,
                 })
 
+            if profiler is not None:
+                profiler.step(watch_list)
+                started = profiler.clock()
+
             after_tick(self.account, watch_list, output)
 
-            current_time += time_step.time_delta
-            current_step += 1
+            if profiler is not None:
+                profiler.add(Phase.AFTER_TICK, started)
+
+            if self.checkpointer is not None and self.checkpointer.due(current_step):
+                self._checkpoint_save(current_step, current_time, output)
+
+    def _checkpoint_save(
+        self, step: int, time: dt.datetime, output: List[Dict[str, Any]]
+    ):
+        position_id = next(Position.ids)
+        Position.ids = itertools.count(position_id)
+
+        self.checkpointer.save(Checkpoint(
+            step, time, self.account,
+            [controller.checkpoint_state() for controller in self.controllers],
+            output, position_id,
+        ))
+
+    def _checkpoint_restore(self) -> Optional[Checkpoint]:
+        if self.checkpointer is None or not self.checkpointer.resume:
+            return None
+
+        checkpoint = self.checkpointer.latest()
+        if checkpoint is None:
+            return None
+
+        self.account.restore(checkpoint.account)
+        Position.ids = itertools.count(checkpoint.position_id)
+
+        for controller, state in zip(self.controllers, checkpoint.controllers):
+            controller.restore_state(state)
+
+        return checkpoint
+
+    def _fingerprint(
+        self, time_step: Granularity, time_from: dt.datetime, time_to: dt.datetime,
+        engine: Engine, stepping: Stepping,
+    ) -> str:
+        # a checkpoint only resumes the same controllers, parameters,
+        # instruments and time range
+        return Checkpointer.run_fingerprint([
+            time_step, time_from, time_to, engine, stepping,
+            [
+                (name, sorted(str(granularity) for granularity in instrument.timeframes),
+                 instrument.time_from, instrument.time_to)
+                for name, instrument in sorted(self.instruments.items())
+            ],
+            [
+                (type(controller).__module__, type(controller).__qualname__,
+                 Checkpointer.parameters(controller))
+                for controller in self.controllers
+            ],
+        ])
+
+    def _heartbeat(self) -> Optional[Granularity]:
+        heartbeats = [
+            controller.heartbeat for controller in self.controllers
+            if controller.heartbeat is not None
+        ]
+
+        return min(heartbeats) if heartbeats else None
 
     @staticmethod
     def _time_format(time: dt.datetime) -> str:
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional, List, Callable
+from typing import Optional, Tuple, Callable, TYPE_CHECKING
 from market_api.candle import Candle
 from market_api.currency import Currency
 from market_api.instrument_meta import InstrumentMeta
@@ -9,41 +9,57 @@ from simulator.context import Context
 from simulator.direction import Direction
 from simulator.lot import Lot
 import datetime as dt
-import uuid
+import itertools
+
+if TYPE_CHECKING:
+    from simulator.position_book import PositionBook
 
 
 class Position:
 
+    __slots__ = (
+        'id', 'instrument', 'base_currency', 
+        'lot', 'count', 'amount', 'margin', 'direction', 
+        'price_open', '_price_close', '_take_profit', '_stop_loss', 
+        'handlers', 'time_open', 'time_close', 'close_type', 'running',
+        'book', 'book_slot',
+    )
+
     class CloseType(Enum):
         MARGIN = 'margin'
         TAKE_PROFIT = 'take_profit'
         STOP_LOSS = 'stop_loss'
         USER = 'user'
 
-    id: uuid.UUID
+    ids = itertools.count(1)
+
+    id: int
     instrument: InstrumentMeta
     base_currency: Currency
     
     lot: Lot
-    couunt: int
+    count: int
     amount: int
     margin: float
 
     direction: Direction
     
     price_open: Candle
-    price_close: Candle
+    _price_close: Candle
 
-    take_profit: Optional[float]
-    stop_loss: Optional[float]
+    _take_profit: Optional[float]
+    _stop_loss: Optional[float]
 
-    handlers: List[Callable]
+    handlers: Tuple[Callable, ...]
 
     time_open: dt.datetime
     time_close: Optional[dt.datetime]
 
     close_type: Optional[CloseType]
     running: bool
+
+    book: Optional['PositionBook']
+    book_slot: Optional[int]
     
     def __init__(
         self, instrument: InstrumentContext, 
@@ -51,7 +67,7 @@ class Position:
         take_profit: Optional[float] = None,
         stop_loss: Optional[float] = None,
     ):
-        self.id = uuid.uuid4()
+        self.id = next(self.ids)
         self.instrument = instrument.instrument_meta
         self.base_currency = instrument.instrument_meta.base_currency
         
@@ -63,10 +79,10 @@ class Position:
             instrument.instrument_meta, count
         )
 
-        self.take_profit = take_profit
-        self.stop_loss = stop_loss
+        self._take_profit = take_profit
+        self._stop_loss = stop_loss
 
-        self.handlers = []
+        self.handlers = ()
         self.direction = direction
 
         self.time_open = instrument.time
@@ -75,10 +91,53 @@ class Position:
         self.close_type = None
         self.running = True
 
+        self.book = None
+        self.book_slot = None
+
         self._freeze_price_open(instrument)
         self._freeze_price_close(instrument)
 
-    def unit_profit(self, close_type: Optional[CloseType] = None) -> float:
+    def __getstate__(self) -> dict:
+        # handlers are usually closures of a controller,
+        # those re-attach them on restore
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state['handlers'] = ()
+        return state
+
+    def __setstate__(self, state: dict):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @property
+    def take_profit(self) -> Optional[float]:
+        return self._take_profit
+
+    @take_profit.setter
+    def take_profit(self, take_profit: Optional[float]):
+        self._take_profit = take_profit
+
+        if self.book is not None:
+            self.book.update(self)
+
+    @property
+    def stop_loss(self) -> Optional[float]:
+        return self._stop_loss
+
+    @stop_loss.setter
+    def stop_loss(self, stop_loss: Optional[float]):
+        self._stop_loss = stop_loss
+
+        if self.book is not None:
+            self.book.update(self)
+
+    @property
+    def price_close(self) -> Candle:
+        if self.running and self.book is not None:
+            return self.book.price_close(self.direction)
+        
+        return self._price_close
+
+    def close_decisive(self, close_type: Optional[CloseType] = None) -> float:
         if close_type is None:
             close_type = self.close_type
         
@@ -87,24 +146,25 @@ class Position:
 
         match (close_type, self.direction):
             case (self.CloseType.USER, _):
-                close_decisive = self.price_close.close
+                return self.price_close.close
             case (self.CloseType.MARGIN, Direction.LONG):
-                close_decisive = self.price_close.low
+                return self.price_close.low
             case (self.CloseType.MARGIN, Direction.SHORT):
-                close_decisive = self.price_close.high
+                return self.price_close.high
             case (self.CloseType.STOP_LOSS, Direction.LONG):
-                close_decisive = self.price_close.low
+                return self.price_close.low
             case (self.CloseType.STOP_LOSS, Direction.SHORT):
-                close_decisive = self.price_close.high
+                return self.price_close.high
             case (self.CloseType.TAKE_PROFIT, Direction.LONG):
-                close_decisive = self.price_close.high
+                return self.price_close.high
             case (self.CloseType.TAKE_PROFIT, Direction.SHORT):
-                close_decisive = self.price_close.low
+                return self.price_close.low
             case _:
                 raise ValueError(f'Unexpected close type: {close_type.value}')
 
+    def unit_profit(self, close_type: Optional[CloseType] = None) -> float:
         unit_profit = self.direction.value * (
-            close_decisive - self.price_open.mean
+            self.close_decisive(close_type) - self.price_open.mean
         )
 
         return self.instrument.round(unit_profit)
@@ -128,7 +188,10 @@ class Position:
         return currency.round(price_currency)
     
     def add_handler(self, handler: Callable):
-        self.handlers.append(handler)
+        self.handlers = (*self.handlers, handler)
+
+        if self.book is not None:
+            self.book.update(self)
     
     def refresh(self, context: Context) -> bool:
         if not self.running:
@@ -161,6 +224,16 @@ class Position:
         self._freeze_price_close(context.get_instrument(self.instrument.name))
         self._close_internal(self.CloseType.USER, context)
 
+    def close_triggered(self, close_type: CloseType, context: Context):
+        if not self.running:
+            raise PositionAlreadyClosedError(self.id)
+
+        self.freeze_price_close(self.price_close)
+        self._close_internal(close_type, context)
+
+    def freeze_price_close(self, price_close: Candle):
+        self._price_close = price_close
+
     def _close_internal(self, close_type: CloseType, context: Context):
         self.time_close = context.time
         self.close_type = close_type
@@ -178,9 +251,9 @@ class Position:
     def _freeze_price_close(self, instrument: InstrumentContext) -> float:
         match self.direction:
             case Direction.LONG:
-                self.price_close = instrument.price.bid
+                self._price_close = instrument.price.bid
             case Direction.SHORT:
-                self.price_close = instrument.price.ask
+                self._price_close = instrument.price.ask
             case _:
                 raise ValueError(f'Unexpected direction: {self.direction.value}')
     
\ No newline at end of file
@@ -0,0 +1,325 @@
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from market_api.candle import Candle
+from market_api.currency import Currency
+from market_api.instrument_meta import InstrumentMeta
+from simulator.instrument_context import InstrumentContext
+from simulator.context import Context
+from simulator.direction import Direction
+from simulator.position import Position
+from simulator.trigger_index import TriggerIndex
+from market_api.granularity import Granularity
+import datetime as dt
+import numpy as np
+
+if TYPE_CHECKING:
+    from simulator.intrabar_resolver import IntrabarResolver
+
+
+class PositionBook:
+
+    CLOSE_TYPES = [
+        None,
+        Position.CloseType.MARGIN,
+        Position.CloseType.STOP_LOSS,
+        Position.CloseType.TAKE_PROFIT,
+    ]
+
+    instrument: InstrumentMeta
+    size: int
+
+    positions: List[Optional[Position]]
+    watched: Dict[int, Position]
+    triggers: TriggerIndex
+
+    price_open: np.ndarray
+    direction: np.ndarray
+    amount: np.ndarray
+    margin: np.ndarray
+    stop_loss: np.ndarray
+    take_profit: np.ndarray
+
+    bid: Optional[Candle]
+    ask: Optional[Candle]
+
+    resolver: Optional['IntrabarResolver']
+    bar_time: Optional[dt.datetime]
+    bar_granularity: Optional[Granularity]
+
+    _payback: Optional[float]
+    _payback_currency: Optional[Currency]
+
+    def __init__(
+        self, instrument: InstrumentMeta, capacity: int = 64,
+        resolver: Optional['IntrabarResolver'] = None,
+    ):
+        self.instrument = instrument
+        self.size = 0
+
+        self.positions = [None] * capacity
+        self.watched = {}
+        self.triggers = TriggerIndex()
+
+        self.price_open = np.zeros(capacity)
+        self.direction = np.zeros(capacity, dtype=np.int8)
+        self.amount = np.zeros(capacity)
+        self.margin = np.zeros(capacity)
+        self.stop_loss = np.full(capacity, np.nan)
+        self.take_profit = np.full(capacity, np.nan)
+
+        self.bid = None
+        self.ask = None
+
+        self.resolver = resolver
+        self.bar_time = None
+        self.bar_granularity = None
+
+        self._payback = None
+        self._payback_currency = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, 'resolver': None}
+
+    def price_close(self, direction: Direction) -> Candle:
+        return self.bid if direction == Direction.LONG else self.ask
+
+    def quote(self, instrument: InstrumentContext):
+        bid = instrument.price.bid
+        ask = instrument.price.ask
+
+        if self.resolver is not None:
+            self.bar_time = instrument.price.time
+            self.bar_granularity = instrument.timeframe_main.granularity
+
+        if (
+            self.bid is None or bid.close != self.bid.close or 
+            ask.close != self.ask.close
+        ):
+            self._payback = None
+
+        self.bid = bid
+        self.ask = ask
+
+    def add(self, position: Position, instrument: InstrumentContext):
+        if self.size == len(self.positions):
+            self._grow()
+
+        self.quote(instrument)
+
+        slot = self.size
+        self.size += 1
+
+        self.positions[slot] = position
+        self.price_open[slot] = position.price_open.mean
+        self.direction[slot] = position.direction.value
+        self.amount[slot] = position.amount
+        self.margin[slot] = position.margin
+
+        position.book = self
+        position.book_slot = slot
+
+        self._payback = None
+
+        self.triggers.add(position, position.price_open.mean)
+        self.update(position)
+
+    def update(self, position: Position):
+        slot = position.book_slot
+
+        self.stop_loss[slot] = np.nan if position.stop_loss is None else position.stop_loss
+        self.take_profit[slot] = np.nan if position.take_profit is None else position.take_profit
+        self.triggers.update(position, position.price_open.mean)
+
+        if position.handlers:
+            self.watched[position.id] = position
+
+    def remove(self, position: Position):
+        slot = position.book_slot
+        last = self.size - 1
+
+        if slot != last:
+            moved = self.positions[last]
+            self.positions[slot] = moved
+            moved.book_slot = slot
+
+            for column in self._columns():
+                column[slot] = column[last]
+
+        self.positions[last] = None
+        self.size -= 1
+
+        self._payback = None
+        self.watched.pop(position.id, None)
+        self.triggers.remove(position)
+
+        # closed positions froze their close price when they were closed
+        if position.running:
+            position.freeze_price_close(self.price_close(position.direction))
+
+        position.book = None
+        position.book_slot = None
+
+    def refresh(self, context: Context) -> List[Position]:
+        if self.size == 0:
+            return []
+
+        self.quote(context.get_instrument(self.instrument.name))
+
+        closed = []
+
+        for position in list(self.watched.values()):
+            if position.running:
+                for handler in position.handlers:
+                    handler(position, context)
+
+            # handlers may close a position, closed through the account it
+            # already left the book, closed directly the account resolves it
+            if not position.running:
+                if position.book is self:
+                    closed.append(position)
+                continue
+
+            self.update(position)
+
+        candidates = [
+            position for position in self.triggers.candidates(
+                self.bid.low, self.bid.high, self.ask.low, self.ask.high,
+            )
+            if position.running
+        ]
+
+        if not candidates:
+            return closed
+
+        slots = np.fromiter(
+            (position.book_slot for position in candidates),
+            dtype=np.intp, count=len(candidates),
+        )
+
+        for position, close_type in zip(candidates, self._close_types(slots)):
+            if close_type:
+                position.close_triggered(self.CLOSE_TYPES[close_type], context)
+                closed.append(position)
+
+        return closed
+
+    def payback(self, currency: Currency) -> float:
+        if self._payback is None or self._payback_currency != currency:
+            # rounded per position like Position.payback_convert,
+            # only recomputed when the close or the book changes
+            slots = slice(0, self.size)
+            base_currency = self.instrument.base_currency
+
+            close = np.where(self.direction[slots] > 0, self.bid.close, self.ask.close)
+            profit = np.round(
+                self._unit_profit(close, slots) * self.amount[slots], base_currency.decimals,
+            )
+            payback = np.round(self.margin[slots] + profit, base_currency.decimals)
+
+            self._payback = float(np.round(
+                base_currency.convert(payback, currency), currency.decimals,
+            ).sum())
+            self._payback_currency = currency
+
+        return self._payback
+
+    def _close_types(self, slots: np.ndarray) -> np.ndarray:
+        margin, stop_loss, take_profit = self._triggers(slots, self.bid, self.ask)
+        close_types = self._first_trigger(margin, stop_loss, take_profit)
+
+        if self.resolver is not None:
+            ambiguous = (
+                margin.astype(int) + stop_loss.astype(int) + take_profit.astype(int)
+            ) > 1
+
+            if ambiguous.any():
+                close_types[ambiguous] = self._resolve_intrabar(
+                    slots[ambiguous], close_types[ambiguous]
+                )
+
+        return close_types
+
+    def _resolve_intrabar(self, slots: np.ndarray, close_types: np.ndarray) -> np.ndarray:
+        # replay the finer candles of the bar, the first one hitting a trigger
+        # decides; ties within a fine candle keep the default priority
+        resolved = np.zeros(len(slots), dtype=close_types.dtype)
+        pending = np.ones(len(slots), dtype=bool)
+
+        fine_candles = self.resolver.fine_candles(
+            self.instrument.name, self.bar_granularity, self.bar_time
+        )
+
+        for bid, ask in fine_candles:
+            fine_types = self._first_trigger(*self._triggers(slots, bid, ask))
+            hit = pending & (fine_types > 0)
+
+            resolved[hit] = fine_types[hit]
+            pending &= ~hit
+
+            if not pending.any():
+                break
+
+        resolved[pending] = close_types[pending]
+        return resolved
+
+    def _triggers(
+        self, slots: np.ndarray, bid: Candle, ask: Candle
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        long = self.direction[slots] > 0
+
+        # decisive prices follow Position.unit_profit: LONG positions close on
+        # the bid, SHORT ones on the ask; adverse for margin and stop-loss
+        adverse = np.where(long, bid.low, ask.high)
+        favorable = np.where(long, bid.high, ask.low)
+
+        unit_adverse = self._unit_profit(adverse, slots)
+        unit_favorable = self._unit_profit(favorable, slots)
+
+        profit_adverse = np.round(
+            unit_adverse * self.amount[slots],
+            self.instrument.base_currency.decimals,
+        )
+
+        with np.errstate(invalid='ignore'):
+            margin = profit_adverse <= -self.margin[slots]
+            stop_loss = unit_adverse <= -self.stop_loss[slots]
+            take_profit = unit_favorable >= self.take_profit[slots]
+
+        return margin, stop_loss, take_profit
+
+    @staticmethod
+    def _first_trigger(
+        margin: np.ndarray, stop_loss: np.ndarray, take_profit: np.ndarray
+    ) -> np.ndarray:
+        return np.where(margin, 1, np.where(stop_loss, 2, np.where(take_profit, 3, 0)))
+
+    def _unit_profit(self, close: np.ndarray, slots: np.ndarray | slice) -> np.ndarray:
+        return np.round(
+            self.direction[slots] * (close - self.price_open[slots]),
+            self.instrument.display_presicion,
+        )
+
+    def _columns(self) -> List[np.ndarray]:
+        return [
+            self.price_open, self.direction, self.amount,
+            self.margin, self.stop_loss, self.take_profit,
+        ]
+
+    def _grow(self):
+        capacity = 2 * len(self.positions)
+        self.positions.extend([None] * (capacity - len(self.positions)))
+
+        self.price_open = self._resize(self.price_open, capacity, 0)
+        self.direction = self._resize(self.direction, capacity, 0)
+        self.amount = self._resize(self.amount, capacity, 0)
+        self.margin = self._resize(self.margin, capacity, 0)
+        self.stop_loss = self._resize(self.stop_loss, capacity, np.nan)
+        self.take_profit = self._resize(self.take_profit, capacity, np.nan)
+
+    @staticmethod
+    def _resize(array: np.ndarray, capacity: int, fill: float) -> np.ndarray:
+        resized = np.full(capacity, fill, dtype=array.dtype)
+        resized[:len(array)] = array
+        return resized
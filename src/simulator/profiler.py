@@ -0,0 +1,124 @@
+from enum import Enum
+from typing import Any, Dict
+from simulator.watch_list import WatchList
+import numpy as np
+import time
+import json
+
+
+class Phase(Enum):
+    CONTEXT = 'context'
+    REFRESH = 'refresh'
+    TICK = 'tick'
+    AFTER_TICK = 'after_tick'
+    EXCEPTION = 'exception'
+
+
+class PhaseTimer:
+
+    count: int
+    total: int
+    samples: np.ndarray
+
+    def __init__(self, capacity: int):
+        self.count = 0
+        self.total = 0
+        self.samples = np.zeros(capacity, dtype=np.int64)
+
+    def add(self, duration: int):
+        # ring buffer, percentiles cover the most recent samples
+        self.samples[self.count % len(self.samples)] = duration
+        self.count += 1
+        self.total += duration
+
+    def stats(self) -> Dict[str, float]:
+        if self.count == 0:
+            return {'count': 0, 'total': 0.0, 'mean': 0.0, 'p50': 0.0, 'p90': 0.0, 'p99': 0.0}
+
+        samples = self.samples[:min(self.count, len(self.samples))]
+        p50, p90, p99 = np.percentile(samples, [50, 90, 99]) / 1e9
+
+        return {
+            'count': self.count,
+            'total': self.total / 1e9,
+            'mean': self.total / self.count / 1e9,
+            'p50': p50,
+            'p90': p90,
+            'p99': p99,
+        }
+
+
+class Profiler:
+
+    capacity: int
+    watch: bool
+
+    steps: int
+    phases: Dict[Phase, PhaseTimer]
+    controllers: Dict[str, PhaseTimer]
+
+    _started: int
+
+    def __init__(self, capacity: int = 65536, watch: bool = False):
+        self.capacity = capacity
+        self.watch = watch
+
+        self.steps = 0
+        self.phases = {phase: PhaseTimer(capacity) for phase in Phase}
+        self.controllers = {}
+
+        self._started = time.perf_counter_ns()
+
+    def start(self):
+        self._started = time.perf_counter_ns()
+
+    @staticmethod
+    def clock() -> int:
+        return time.perf_counter_ns()
+
+    def add(self, phase: Phase, started: int) -> int:
+        now = time.perf_counter_ns()
+        self.phases[phase].add(now - started)
+        return now
+
+    def add_controller(self, name: str, started: int) -> int:
+        now = time.perf_counter_ns()
+
+        if name not in self.controllers:
+            self.controllers[name] = PhaseTimer(self.capacity)
+
+        self.controllers[name].add(now - started)
+        return now
+
+    def step(self, watch_list: WatchList):
+        self.steps += 1
+
+        if self.watch:
+            watch_list.add('steps/s', f'{self.steps_per_second:.1f}')
+
+            for phase, timer in self.phases.items():
+                if timer.count > 0:
+                    watch_list.add(
+                        f'{phase.value} [ms]', f'{timer.total / timer.count / 1e6:.3f}'
+                    )
+
+    @property
+    def steps_per_second(self) -> float:
+        elapsed = (time.perf_counter_ns() - self._started) / 1e9
+        return self.steps / elapsed if elapsed > 0 else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'steps': self.steps,
+            'steps_per_second': self.steps_per_second,
+            'phases': {
+                phase.value: timer.stats() for phase, timer in self.phases.items()
+            },
+            'controllers': {
+                name: timer.stats() for name, timer in self.controllers.items()
+            },
+        }
+
+    def to_json(self, path: str):
+        with open(path, 'w') as file:
+            json.dump(self.stats(), file, indent=2)
@@ -0,0 +1,74 @@
+from typing import Any, Callable, Dict, List, Optional
+from rich.console import RenderableType
+from rich.live import Live
+from simulator.watch_list import WatchList
+import threading
+
+
+class Snapshot:
+
+    positions: List[Dict[str, Any]]
+    watch_list: WatchList
+    output: List[Dict[str, Any]]
+
+    def __init__(
+        self, positions: List[Dict[str, Any]], watch_list: WatchList, 
+        output: List[Dict[str, Any]],
+    ):
+        self.positions = positions
+        self.watch_list = watch_list
+        self.output = output
+
+
+class RenderThread(threading.Thread):
+
+    live: Live
+    render: Callable[[Snapshot], RenderableType]
+    refresh_per_second: float
+
+    _snapshot: Optional[Snapshot]
+    _lock: threading.Lock
+    _stopped: threading.Event
+
+    def __init__(
+        self, live: Live, render: Callable[[Snapshot], RenderableType],
+        refresh_per_second: float,
+    ):
+        super().__init__(daemon=True)
+
+        self.live = live
+        self.render = render
+        self.refresh_per_second = refresh_per_second
+
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    @property
+    def waiting(self) -> bool:
+        # the previous snapshot was rendered, a new one would not be dropped
+        return self._snapshot is None
+
+    def publish(self, snapshot: Snapshot):
+        with self._lock:
+            self._snapshot = snapshot
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def run(self):
+        interval = 1 / self.refresh_per_second
+
+        while not self._stopped.wait(interval):
+            self._render_latest()
+
+        self._render_latest()
+
+    def _render_latest(self):
+        with self._lock:
+            snapshot = self._snapshot
+            self._snapshot = None
+
+        if snapshot is not None:
+            self.live.update(self.render(snapshot))
@@ -0,0 +1,273 @@
+from typing import Dict, List, Optional
+from market_api.instrument_data import InstrumentData
+from market_api.timeframe_arrays import TimeframeArrays
+from simulator.a_signal_controller import ASignalController
+from simulator.account import Account
+from simulator.direction import Direction
+from simulator.engine import CursorContextBuilder
+from simulator.exceptions import BalanceTooLowError
+from simulator.position import Position
+from simulator.signals import Signals
+import datetime as dt
+import numpy as np
+import pandas as pd
+import heapq
+
+
+class SignalTrack:
+
+    controller: ASignalController
+    arrays: TimeframeArrays
+    signals: Signals
+
+    bid: tuple
+    ask: tuple
+
+    running: Dict[int, list]
+    trades: List[list]
+
+    def __init__(self, controller: ASignalController, instrument_data: InstrumentData):
+        self.controller = controller
+        self.arrays = instrument_data.timeframe_main.get_arrays()
+        self.signals = Signals.from_frame(
+            controller.signals(instrument_data), self.arrays.frame.index
+        )
+
+        self.bid = self.arrays.candle_columns('bid')
+        self.ask = self.arrays.candle_columns('ask')
+
+        self.running = {}
+        self.trades = []
+
+
+class SignalEngine:
+
+    SEARCH_WINDOW = 64
+
+    account: Account
+
+    instruments: Dict[str, InstrumentData]
+    controllers: List[ASignalController]
+
+    errors: int
+
+    def __init__(self, account: Account):
+        self.account = account
+
+        self.instruments = {}
+        self.controllers = []
+
+        self.errors = 0
+
+    def add_instrument(self, instrument_data: InstrumentData):
+        self.instruments[instrument_data.instrument_meta.name] = instrument_data
+
+    def add_controller(self, controller: ASignalController):
+        self.controllers.append(controller)
+
+    def run(self, time_from: dt.datetime, time_to: dt.datetime) -> pd.DataFrame:
+        tracks = [
+            SignalTrack(controller, self.instruments[controller.symbol])
+            for controller in self.controllers
+        ]
+
+        value_from = TimeframeArrays.time_value(time_from)
+        value_to = TimeframeArrays.time_value(time_to)
+
+        times = np.unique(np.concatenate([
+            track.arrays.times[
+                (track.arrays.times >= value_from) & (track.arrays.times <= value_to)
+            ]
+            for track in tracks
+        ]))
+
+        # only bars with a signal or a triggered close touch the account,
+        # those in between just move the running payback
+        scheduled = np.unique(np.concatenate([
+            track.arrays.times[(track.signals.direction != 0) | track.signals.exit]
+            for track in tracks
+        ]))
+        scheduled = scheduled[(scheduled >= value_from) & (scheduled <= value_to)]
+
+        triggers = []
+        balance = np.full(len(times), np.nan)
+        balance_start = self.account.balance
+
+        context_builder = CursorContextBuilder(self.instruments)
+        scheduled_index = 0
+
+        while scheduled_index < len(scheduled) or triggers:
+            if triggers and (
+                scheduled_index == len(scheduled) or triggers[0] <= scheduled[scheduled_index]
+            ):
+                time_value = heapq.heappop(triggers)
+            else:
+                time_value = scheduled[scheduled_index]
+                scheduled_index += 1
+
+            while triggers and triggers[0] == time_value:
+                heapq.heappop(triggers)
+
+            if scheduled_index < len(scheduled) and scheduled[scheduled_index] == time_value:
+                scheduled_index += 1
+
+            step = np.searchsorted(times, time_value)
+            time = pd.Timestamp(time_value, tz='UTC')
+
+            context = context_builder.build(time)
+            self.account.refresh(context)
+
+            for track in tracks:
+                self._record_closed(track, step)
+
+                position = track.arrays.position(time)
+                if position < 0 or track.arrays.times[position] != time_value:
+                    continue
+
+                if track.signals.exit[position]:
+                    for position_id in list(track.running):
+                        self.account.position_close(position_id)
+
+                    self._record_closed(track, step)
+
+                if track.signals.direction[position] != 0:
+                    trigger = self._open(track, position, step, value_to)
+
+                    if trigger is not None:
+                        heapq.heappush(triggers, trigger)
+
+            balance[step] = self.account.balance
+
+        return self._equity_curve(tracks, times, balance, balance_start)
+
+    def _open(
+        self, track: SignalTrack, position: int, step: int, value_to: int,
+    ) -> Optional[int]:
+        signals = track.signals
+
+        try:
+            opened = self.account.position_open(
+                track.controller.symbol, track.controller.lot,
+                int(signals.count[position]),
+                Direction(int(signals.direction[position])),
+                take_profit=Signals.optional(signals.take_profit[position]),
+                stop_loss=Signals.optional(signals.stop_loss[position]),
+            )
+        except BalanceTooLowError:
+            self.errors += 1
+            return None
+
+        trade = [opened, step, None]
+        track.running[opened.id] = trade
+        track.trades.append(trade)
+
+        end = np.searchsorted(track.arrays.times, value_to, 'right')
+        trigger = self._first_trigger(track, opened, position + 1, end)
+
+        return None if trigger is None else track.arrays.times[trigger]
+
+    def _first_trigger(
+        self, track: SignalTrack, position: Position, start: int, end: int,
+    ) -> Optional[int]:
+        # mirrors PositionBook._triggers over growing windows of candles
+        instrument = position.instrument
+        sign = position.direction.value
+        price_open = position.price_open.mean
+
+        if position.direction == Direction.LONG:
+            adverse, favorable = track.bid[3], track.bid[2]
+        else:
+            adverse, favorable = track.ask[2], track.ask[3]
+
+        window = self.SEARCH_WINDOW
+
+        while start < end:
+            stop = min(end, start + window)
+
+            unit_adverse = np.round(
+                sign * (adverse[start:stop] - price_open), instrument.display_presicion
+            )
+            profit_adverse = np.round(
+                unit_adverse * position.amount, instrument.base_currency.decimals
+            )
+
+            hit = profit_adverse <= -position.margin
+
+            if position.stop_loss is not None:
+                hit |= unit_adverse <= -position.stop_loss
+
+            if position.take_profit is not None:
+                hit |= np.round(
+                    sign * (favorable[start:stop] - price_open), instrument.display_presicion
+                ) >= position.take_profit
+
+            if hit.any():
+                return start + int(np.argmax(hit))
+
+            start = stop
+            window *= 2
+
+        return None
+
+    def _record_closed(self, track: SignalTrack, step: int):
+        for position_id, trade in list(track.running.items()):
+            if position_id not in self.account.running:
+                trade[2] = step
+                del track.running[position_id]
+
+    def _equity_curve(
+        self, tracks: List[SignalTrack], times: np.ndarray,
+        balance: np.ndarray, balance_start: float,
+    ) -> pd.DataFrame:
+        count = len(times)
+        currency = self.account.currency
+
+        payback = np.zeros(count)
+        running = np.zeros(count, dtype=np.int64)
+
+        for track in tracks:
+            # candle prices of the instrument, carried forward over the union of times
+            latest = np.searchsorted(track.arrays.times, times, 'right') - 1
+            quoted = latest >= 0
+            latest = np.maximum(latest, 0)
+
+            base_currency = self.instruments[track.controller.symbol].instrument_meta.base_currency
+
+            for direction, close in (
+                (Direction.LONG, track.bid[1]), (Direction.SHORT, track.ask[1])
+            ):
+                trades = [trade for trade in track.trades if trade[0].direction == direction]
+
+                if not trades:
+                    continue
+
+                opened = np.array([trade[1] for trade in trades])
+                closed = np.array([count if trade[2] is None else trade[2] for trade in trades])
+
+                def running_sum(values: np.ndarray) -> np.ndarray:
+                    diff = np.zeros(count + 1)
+                    np.add.at(diff, opened, values)
+                    np.add.at(diff, closed, -values)
+                    return np.cumsum(diff[:count])
+
+                amount = np.array([trade[0].amount for trade in trades], dtype=np.float64)
+                margin = np.array([trade[0].margin for trade in trades])
+                cost = amount * np.array([trade[0].price_open.mean for trade in trades])
+
+                amount_sum = running_sum(amount)
+                price = np.where(quoted, close[latest], 0.0)
+
+                payback += base_currency.convert(
+                    running_sum(margin) + direction.value * (
+                        price * amount_sum - running_sum(cost)
+                    ), currency
+                )
+                running += np.round(running_sum(np.ones(len(trades)))).astype(np.int64)
+
+        balance = pd.Series(balance).ffill().fillna(balance_start).to_numpy()
+
+        return pd.DataFrame({
+            'balance': balance,
+            'equity': np.round(balance + payback, currency.decimals),
+            'running': running,
+        }, index=pd.DatetimeIndex(times, tz='UTC', name='time'))
@@ -0,0 +1,49 @@
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+
+class Signals:
+
+    direction: np.ndarray
+    count: np.ndarray
+    stop_loss: np.ndarray
+    take_profit: np.ndarray
+    exit: np.ndarray
+
+    def __init__(
+        self, direction: np.ndarray, count: np.ndarray,
+        stop_loss: np.ndarray, take_profit: np.ndarray, exit: np.ndarray,
+    ):
+        self.direction = direction
+        self.count = count
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.exit = exit
+
+    def __len__(self) -> int:
+        return len(self.direction)
+
+    @staticmethod
+    def from_frame(frame: pd.DataFrame, index: pd.Index) -> 'Signals':
+        frame = frame.reindex(index)
+
+        def column(name: str, default: float, dtype: type) -> np.ndarray:
+            if name not in frame.columns:
+                return np.full(len(index), default, dtype=dtype)
+
+            return frame[name].fillna(default).to_numpy(dtype=dtype)
+
+        direction = np.sign(column('direction', 0, np.float64)).astype(np.int8)
+
+        return Signals(
+            direction,
+            column('count', 1, np.int64),
+            column('stop_loss', np.nan, np.float64),
+            column('take_profit', np.nan, np.float64),
+            column('exit', False, bool),
+        )
+
+    @staticmethod
+    def optional(value: float) -> Optional[float]:
+        return None if np.isnan(value) else float(value)
@@ -1,38 +1,51 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional
 from market_api.granularity import Granularity
-from market_api.oanda.client import Client
+from market_api.a_provider import AProvider
 from simulator.loop import Loop
-from rich_tools.rich_tools import ListStatic, Column, ColumnComputed
-from market_api.instrument_meta import InstrumentMeta
+from rich_tools.rich_tools import ListStatic, Column
 from simulator.position import Position
 from simulator.a_controller import AController
+from simulator.a_signal_controller import ASignalController
+from simulator.signal_engine import SignalEngine
 from simulator.account import Account
 from simulator.watch_list import WatchList
+from simulator.engine import Engine
+from simulator.stepping import Stepping
+from simulator.sweep import Sweep
+from simulator.display import Display
+from simulator.render_thread import RenderThread, Snapshot
+from simulator.intrabar_resolver import IntrabarResolver
+from simulator.checkpoint import Checkpointer
+from simulator.profiler import Profiler
 from rich.live import Live
 from rich.table import Table
+from rich.console import RenderableType
 import datetime as dt
-import warnings
+import pandas as pd
 
 
 class Simulator:
 
     refresh_per_second: int = 4
+    engine: Engine = Engine.PANDAS
+    stepping: Stepping = Stepping.FIXED
+    display: Display = Display.LIVE
+    intrabar_granularity: Optional[Granularity] = None
+    checkpointer: Optional[Checkpointer] = None
+    profiler: Optional[Profiler] = None
     debug: bool = False
 
+    market_api: AProvider
+
     def __init__(
         self, play_account: Account, 
-        oanda_account_id: str, oanda_api_key: str, 
+        market_api: AProvider, 
         debug: bool = False,
     ):
-        self.market_api = Client(oanda_account_id, oanda_api_key)
+        self.market_api = market_api
         self.loop = Loop(play_account)
         self.debug = debug
 
-        warnings.filterwarnings(
-            "ignore", message=
-            "Boolean Series key will be reindexed to match DataFrame index."
-        )
-
     def add_controller(self, controller: AController):
         self.loop.add_controller(controller)
 
@@ -47,65 +60,221 @@ class Simulator:
         for instrument in instrument_data:
             self.loop.add_instrument(instrument)
 
-        running_positions = self._running_positions_list()
-        globals_list = self._globals_list()
-        output_buffer = self._output_buffer()
+        if self.intrabar_granularity is not None:
+            self.loop.account.intrabar_resolver = IntrabarResolver(
+                self.market_api, self.intrabar_granularity
+            )
+
+        self.loop.checkpointer = self.checkpointer
+        self.loop.profiler = self.profiler
+
+        match self.display:
+            case Display.HEADLESS:
+                self._run_headless(time_step, time_from, time_to)
+            case Display.LIVE:
+                self._run_live(time_step, time_from, time_to)
+            case Display.THREADED:
+                self._run_threaded(time_step, time_from, time_to)
+            case _:
+                raise ValueError(f'Unexpected display: {self.display.value}')
+
+    def run_sweep(
+        self, controller_factory: Callable[..., AController], 
+        parameters: List[Dict[str, Any]],
+        symbols: List[str], granularities: List[Granularity],
+        time_step: Granularity, time_from: dt.datetime, time_to: dt.datetime,
+        processes: Optional[int] = None,
+    ) -> pd.DataFrame:
+        instrument_data = list(self.market_api.instrument_data(
+            symbols, granularities, time_from, time_to
+        ))
+
+        sweep = Sweep(
+            self.loop.account.balance, self.loop.account.currency, 
+            controller_factory,
+        )
+
+        sweep.engine = self.engine
+        sweep.stepping = self.stepping
+        sweep.processes = processes
+
+        return sweep.run(
+            instrument_data, parameters, time_step, time_from, time_to
+        )
+
+    def run_signals(
+        self, controllers: List[ASignalController],
+        granularities: List[Granularity],
+        time_from: dt.datetime, time_to: dt.datetime,
+    ) -> pd.DataFrame:
+        symbols = list(dict.fromkeys(controller.symbol for controller in controllers))
+        engine = SignalEngine(self.loop.account)
+
+        for instrument in self.market_api.instrument_data(
+            symbols, granularities, time_from, time_to
+        ):
+            engine.add_instrument(instrument)
+
+        for controller in controllers:
+            engine.add_controller(controller)
+
+        return engine.run(time_from, time_to)
+
+    def _run_headless(
+        self, time_step: Granularity, 
+        time_from: dt.datetime, time_to: dt.datetime,
+    ):
+        def after_tick(
+            account: Account, watch_list: WatchList, 
+            output: List[Dict[str, Any]]
+        ):
+            if self.debug:
+                input()
+
+        self.loop.run(
+            time_step, time_from, time_to, after_tick, 
+            self.engine, self.stepping,
+        )
+
+    def _run_live(
+        self, time_step: Granularity, 
+        time_from: dt.datetime, time_to: dt.datetime,
+    ):
+        render = self._dashboard()
+        positions_rows = self._running_positions_list().max_rows
 
         with Live(refresh_per_second=self.refresh_per_second) as live:
             def after_tick(
                 account: Account, watch_list: WatchList, 
                 output: List[Dict[str, Any]]
             ):
-                super_grid = Table.grid()
-                super_grid.add_column()
+                snapshot = Snapshot(
+                    self._position_rows(account.positions_running_latest(positions_rows)),
+                    watch_list, output,
+                )
+
+                if self.debug:
+                    input()
+
+                live.update(render(snapshot))
 
-                grid = Table.grid()
-                
-                grid.add_column()
-                grid.add_column()
+            self.loop.run(
+                time_step, time_from, time_to, after_tick, 
+                self.engine, self.stepping,
+            )
 
-                grid.add_row(
-                    running_positions.render(account.positions_running), 
-                    globals_list.render(watch_list.get_data()),
+    def _run_threaded(
+        self, time_step: Granularity, 
+        time_from: dt.datetime, time_to: dt.datetime,
+    ):
+        render = self._dashboard()
+        positions_rows = self._running_positions_list().max_rows
+        output_rows = self._output_buffer().max_rows
+
+        with Live(refresh_per_second=self.refresh_per_second) as live:
+            render_thread = RenderThread(live, render, self.refresh_per_second)
+            render_thread.start()
+
+            def snapshot(
+                account: Account, watch_list: WatchList, 
+                output: List[Dict[str, Any]]
+            ) -> Snapshot:
+                return Snapshot(
+                    self._position_rows(account.positions_running_latest(positions_rows)),
+                    watch_list, output[-output_rows:],
                 )
 
-                super_grid.add_row(grid)
+            last_tick = None
+
+            def after_tick(
+                account: Account, watch_list: WatchList, 
+                output: List[Dict[str, Any]]
+            ):
+                nonlocal last_tick
+                last_tick = (account, watch_list, output)
 
-                if (len(output) > 0):
-                    super_grid.add_row(output_buffer.render(output))
+                # rows are only built once the renderer took the previous
+                # snapshot, at most once per refresh instead of every step
+                if render_thread.waiting:
+                    render_thread.publish(snapshot(*last_tick))
 
                 if self.debug:
                     input()
 
-                live.update(super_grid)
+            try:
+                self.loop.run(
+                    time_step, time_from, time_to, after_tick, 
+                    self.engine, self.stepping,
+                )
+            finally:
+                if last_tick is not None:
+                    render_thread.publish(snapshot(*last_tick))
+
+                render_thread.stop()
+
+    def _dashboard(self) -> Callable[[Snapshot], RenderableType]:
+        running_positions = self._running_positions_list()
+        globals_list = self._globals_list()
+        output_buffer = self._output_buffer()
+
+        def render(snapshot: Snapshot) -> RenderableType:
+            super_grid = Table.grid()
+            super_grid.add_column()
+
+            grid = Table.grid()
+            
+            grid.add_column()
+            grid.add_column()
+
+            grid.add_row(
+                running_positions.render(snapshot.positions), 
+                globals_list.render(snapshot.watch_list.get_data()),
+            )
+
+            super_grid.add_row(grid)
+
+            if (len(snapshot.output) > 0):
+                super_grid.add_row(output_buffer.render(snapshot.output))
+
+            return super_grid
 
-            self.loop.run(time_step, time_from, time_to, after_tick)
+        return render
 
     @staticmethod
     def _time_format(time: dt.datetime) -> str:
         return time.strftime('%Y-%m-%d %H:%M:%S')
 
+    @staticmethod
+    def _position_rows(positions: List[Position]) -> List[Dict[str, Any]]:
+        # plain values taken on the loop thread, the renderer never
+        # touches positions the loop keeps mutating
+        rows = []
+
+        for position in positions:
+            unit_profit = position.unit_profit()
+            color = "green" if unit_profit > 0 else "red"
+
+            rows.append({
+                'id': position.id,
+                'instrument': position.instrument.display_name,
+                'time_open': position.time_open,
+                'price_open': position.instrument.format(position.price_open.mean),
+                'direction': position.direction,
+                'unit_profit': f'[{color}]{position.instrument.format(unit_profit)}',
+            })
+
+        return rows
+
     @classmethod
     def _running_positions_list(cls) -> ListStatic:
-        def price_open(item: Position) -> float:
-            return item.instrument.format(item.price_open.mean)
-        
-        def unit_profit(item: Position) -> str:
-            value = item.unit_profit()
-            color = "green" if value > 0 else "red"
-            return f'[{color}]{item.instrument.format(value)}'
-        
-        def display_name(item: InstrumentMeta) -> str:
-            return item.display_name
-
         my_list = ListStatic()
 
         my_list.add_column(Column('id', 'id'))
-        my_list.add_column(Column('instrument', 'symbol', display_name))
+        my_list.add_column(Column('instrument', 'symbol'))
         my_list.add_column(Column('time_open', 'time open', cls._time_format))
-        my_list.add_column(ColumnComputed('price open', price_open, args={'justify': 'right'}))
+        my_list.add_column(Column('price_open', 'price open', args={'justify': 'right'}))
         my_list.add_column(Column('direction', 'direction'))
-        my_list.add_column(ColumnComputed('unit profit', unit_profit, args={'justify': 'right'}))
+        my_list.add_column(Column('unit_profit', 'unit profit', args={'justify': 'right'}))
             
         my_list.add_argument('width', 120)
         
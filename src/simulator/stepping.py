@@ -0,0 +1,77 @@
+from enum import Enum
+from typing import Dict, Iterator, Optional, Tuple
+from market_api.granularity import Granularity
+from market_api.instrument_data import InstrumentData
+from market_api.timeframe_arrays import TimeframeArrays
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+
+class Stepping(Enum):
+
+    FIXED = 'fixed'
+    EVENTS = 'events'
+
+    def steps(
+        self, instruments: Dict[str, InstrumentData], time_step: Granularity,
+        time_from: dt.datetime, time_to: dt.datetime,
+        heartbeat: Optional[Granularity] = None,
+    ) -> Tuple[int, Iterator[dt.datetime]]:
+        match self:
+            case Stepping.FIXED:
+                return self._times_fixed(time_step, time_from, time_to)
+            case Stepping.EVENTS:
+                return self._times_events(
+                    instruments, time_step, time_from, time_to, heartbeat
+                )
+            case _:
+                raise ValueError(f'Unexpected stepping: {self.value}')
+
+    @staticmethod
+    def _times_fixed(
+        time_step: Granularity, time_from: dt.datetime, time_to: dt.datetime
+    ) -> Tuple[int, Iterator[dt.datetime]]:
+        def times() -> Iterator[dt.datetime]:
+            current_time = time_from
+            while current_time <= time_to:
+                yield current_time
+                current_time += time_step.time_delta
+
+        steps_count = int((time_to - time_from) / time_step.time_delta)
+        return steps_count, times()
+
+    @staticmethod
+    def _times_events(
+        instruments: Dict[str, InstrumentData], time_step: Granularity,
+        time_from: dt.datetime, time_to: dt.datetime,
+        heartbeat: Optional[Granularity],
+    ) -> Tuple[int, Iterator[dt.datetime]]:
+        value_from = TimeframeArrays.time_value(time_from)
+        value_to = TimeframeArrays.time_value(time_to)
+        value_step = TimeframeArrays.time_value(time_from + time_step.time_delta) - value_from
+
+        candle_times = [
+            timeframe.data.index.asi8
+            for instrument in instruments.values()
+            for timeframe in instrument.timeframes.values()
+        ]
+
+        if heartbeat is not None:
+            value_heartbeat = TimeframeArrays.time_value(
+                time_from + heartbeat.time_delta
+            ) - value_from
+
+            candle_times.append(
+                np.arange(value_from, value_to + 1, value_heartbeat, dtype=np.int64)
+            )
+
+        values = np.concatenate(candle_times) if candle_times else np.empty(0, np.int64)
+        values = values[(values >= value_from) & (values <= value_to)]
+
+        # snap each candle up to the first step of the fixed grid that sees it
+        steps = -((value_from - values) // value_step)
+        values = np.unique(value_from + steps * value_step)
+        values = values[values <= value_to]
+
+        return len(values), iter(pd.to_datetime(values, utc=True).to_pydatetime())
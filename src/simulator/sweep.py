@@ -0,0 +1,117 @@
+from typing import List, Dict, Any, Callable, Optional
+from concurrent.futures import ProcessPoolExecutor
+from market_api.currency import Currency
+from market_api.granularity import Granularity
+from market_api.instrument_data import InstrumentData
+from market_api.shared_candles import SharedCandleStore
+from simulator.a_controller import AController
+from simulator.account import Account
+from simulator.engine import Engine
+from simulator.loop import Loop
+from simulator.stepping import Stepping
+from simulator.trade_journal import TradeJournal
+from simulator.watch_list import WatchList
+import datetime as dt
+import pandas as pd
+
+
+_worker_instruments: List[InstrumentData] = []
+_worker_store: Optional[SharedCandleStore] = None
+
+
+class Sweep:
+
+    balance: float
+    currency: Currency
+    controller_factory: Callable[..., AController]
+
+    engine: Engine = Engine.CURSOR
+    stepping: Stepping = Stepping.FIXED
+    processes: Optional[int] = None
+
+    def __init__(
+        self, balance: float, currency: Currency,
+        controller_factory: Callable[..., AController],
+    ):
+        self.balance = balance
+        self.currency = currency
+        self.controller_factory = controller_factory
+
+    def run(
+        self, instrument_data: List[InstrumentData],
+        parameters: List[Dict[str, Any]], time_step: Granularity,
+        time_from: dt.datetime, time_to: dt.datetime,
+    ) -> pd.DataFrame:
+        with SharedCandleStore() as store:
+            for instrument in instrument_data:
+                store.publish(instrument)
+
+            tasks = [
+                (
+                    self.balance, self.currency, self.controller_factory, params,
+                    time_step, time_from, time_to, self.engine, self.stepping,
+                )
+                for params in parameters
+            ]
+
+            with ProcessPoolExecutor(
+                self.processes, initializer=_sweep_attach, initargs=(store,)
+            ) as executor:
+                results = list(executor.map(_sweep_run, tasks))
+
+        return pd.DataFrame([
+            {**params, **result}
+            for params, result in zip(parameters, results)
+        ])
+
+
+def _sweep_attach(store: SharedCandleStore):
+    global _worker_instruments, _worker_store
+
+    _worker_store = store
+    _worker_instruments = store.attach()
+
+
+def _sweep_run(task: tuple) -> Dict[str, Any]:
+    (
+        balance, currency, controller_factory, params,
+        time_step, time_from, time_to, engine, stepping,
+    ) = task
+
+    account = Account(balance, currency, TradeJournal.MEMORY)
+    loop = Loop(account)
+
+    for instrument in _worker_instruments:
+        loop.add_instrument(instrument)
+
+    loop.add_controller(controller_factory(**params))
+
+    equity_peak = balance
+    drawdown = 0.0
+    errors = 0
+
+    def after_tick(
+        account: Account, watch_list: WatchList,
+        output: List[Dict[str, Any]]
+    ):
+        nonlocal equity_peak, drawdown, errors
+
+        equity = account.equity
+        equity_peak = max(equity_peak, equity)
+
+        if equity_peak > 0:
+            drawdown = max(drawdown, (equity_peak - equity) / equity_peak)
+
+        if output and output.pop()['error'] is not None:
+            errors += 1
+
+    loop.run(time_step, time_from, time_to, after_tick, engine, stepping)
+
+    return {
+        'equity': account.equity,
+        'balance': account.balance,
+        'running': account.count_running,
+        'closed': account.count_closed,
+        'drawdown': drawdown,
+        'errors': errors,
+    }
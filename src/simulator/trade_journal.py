@@ -0,0 +1,165 @@
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from market_api.currency import Currency
+from simulator.position import Position
+import pyarrow.parquet as pq
+import pyarrow as pa
+import pandas as pd
+import tempfile
+import weakref
+import shutil
+import glob
+import os
+
+
+class TradeJournal:
+
+    MEMORY = ':memory:'
+
+    SCHEMA = pa.schema([
+        ('id', pa.int64()),
+        ('instrument', pa.string()),
+        ('direction', pa.string()),
+        ('lot', pa.string()),
+        ('count', pa.int64()),
+        ('time_open', pa.timestamp('ns', tz='UTC')),
+        ('time_close', pa.timestamp('ns', tz='UTC')),
+        ('price_open', pa.float64()),
+        ('price_close', pa.float64()),
+        ('close_type', pa.string()),
+        ('profit', pa.float64()),
+    ])
+
+    directory: str
+    batch_size: int
+    window: int
+
+    count: int
+    profit: float
+
+    recent: 'OrderedDict[int, Position]'
+
+    _rows: List[Dict[str, Any]]
+    _batches: List[pa.Table]
+    _parts: int
+    _cleanup: Optional[weakref.finalize]
+
+    def __init__(
+        self, directory: Optional[str] = None,
+        batch_size: int = 10000, window: int = 1000,
+    ):
+        # parts spill to a temporary directory unless one is given,
+        # MEMORY keeps the batches in memory instead
+        self._cleanup = None
+
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix='trade-journal-')
+            self._own(directory)
+
+        self.directory = directory
+        self.batch_size = batch_size
+        self.window = window
+
+        self.count = 0
+        self.profit = 0.0
+
+        self.recent = OrderedDict()
+
+        self._rows = []
+        self._batches = []
+        self._parts = 0
+
+        if directory != self.MEMORY:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, '_cleanup': None}
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+
+        # a temporary directory did not outlive the run that created it,
+        # a restored journal starts a new one
+        if self.directory != self.MEMORY and not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+            self._own(self.directory)
+
+    def append(self, position: Position, currency: Currency):
+        profit = position.profit_convert(currency)
+
+        self._rows.append({
+            'id': position.id,
+            'instrument': position.instrument.name,
+            'direction': position.direction.name,
+            'lot': position.lot.name,
+            'count': position.count,
+            'time_open': position.time_open,
+            'time_close': position.time_close,
+            'price_open': position.price_open.mean,
+            'price_close': position.close_decisive(),
+            'close_type': position.close_type.value,
+            'profit': profit,
+        })
+
+        self.count += 1
+        self.profit += profit
+
+        self.recent[position.id] = position
+        if len(self.recent) > self.window:
+            self.recent.popitem(last=False)
+
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def get(self, position_id: int) -> Optional[Position]:
+        return self.recent.get(position_id)
+
+    def latest(self, n: int) -> List[Position]:
+        return list(self.recent.values())[-n:]
+
+    def flush(self):
+        if not self._rows:
+            return
+
+        table = pa.Table.from_pylist(self._rows, schema=self.SCHEMA)
+        self._rows = []
+
+        if self.directory == self.MEMORY:
+            self._batches.append(table)
+            return
+
+        self._parts += 1
+        pq.write_table(table, os.path.join(
+            self.directory, f'part-{self._parts:06d}.parquet'
+        ))
+
+    def read(self) -> pd.DataFrame:
+        self.flush()
+
+        if self.directory == self.MEMORY:
+            tables = self._batches
+        else:
+            tables = [pq.read_table(path) for path in self._paths()]
+
+        if not tables:
+            return self.SCHEMA.empty_table().to_pandas()
+
+        return pa.concat_tables(tables).to_pandas()
+
+    def close(self):
+        # only a temporary directory the journal created is removed
+        if self._cleanup is not None:
+            self._cleanup()
+            self._cleanup = None
+
+    def _own(self, directory: str):
+        self._cleanup = weakref.finalize(self, shutil.rmtree, directory, ignore_errors=True)
+
+    def _paths(self) -> List[str]:
+        # parts beyond the counter are leftovers of a run resumed from a checkpoint
+        return sorted(
+            glob.glob(os.path.join(self.directory, 'part-*.parquet'))
+        )[:self._parts]
@@ -0,0 +1,127 @@
+from typing import Dict, List, Optional, Tuple
+from simulator.direction import Direction
+from simulator.position import Position
+from bisect import bisect_left, bisect_right
+import math
+
+
+class TriggerLadder:
+
+    levels: List[float]
+    positions: List[Position]
+
+    def __init__(self):
+        self.levels = []
+        self.positions = []
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def add(self, level: float, position: Position):
+        index = bisect_right(self.levels, level)
+        self.levels.insert(index, level)
+        self.positions.insert(index, position)
+
+    def remove(self, level: float, position: Position):
+        index = bisect_left(self.levels, level)
+        while self.positions[index] is not position:
+            index += 1
+
+        del self.levels[index]
+        del self.positions[index]
+
+    def at_or_above(self, price: float) -> List[Position]:
+        return self.positions[bisect_left(self.levels, price):]
+
+    def at_or_below(self, price: float) -> List[Position]:
+        return self.positions[:bisect_right(self.levels, price)]
+
+
+class TriggerIndex:
+
+    adverse: Dict[Direction, TriggerLadder]
+    favorable: Dict[Direction, TriggerLadder]
+
+    levels: Dict[int, Tuple[Optional[float], Optional[float]]]
+
+    def __init__(self):
+        self.adverse = {direction: TriggerLadder() for direction in Direction}
+        self.favorable = {direction: TriggerLadder() for direction in Direction}
+
+        self.levels = {}
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def add(self, position: Position, price_open: float):
+        adverse, favorable = self._levels(position, price_open)
+
+        if adverse is not None:
+            self.adverse[position.direction].add(adverse, position)
+
+        if favorable is not None:
+            self.favorable[position.direction].add(favorable, position)
+
+        self.levels[position.id] = (adverse, favorable)
+
+    def remove(self, position: Position):
+        adverse, favorable = self.levels.pop(position.id)
+
+        if adverse is not None:
+            self.adverse[position.direction].remove(adverse, position)
+
+        if favorable is not None:
+            self.favorable[position.direction].remove(favorable, position)
+
+    def update(self, position: Position, price_open: float):
+        if self._levels(position, price_open) != self.levels[position.id]:
+            self.remove(position)
+            self.add(position, price_open)
+
+    def candidates(
+        self, bid_low: float, bid_high: float, ask_low: float, ask_high: float,
+    ) -> List[Position]:
+        # LONG positions close on the bid, SHORT positions on the ask
+        candidates = {}
+
+        for position in self.adverse[Direction.LONG].at_or_above(bid_low):
+            candidates[position.id] = position
+        for position in self.favorable[Direction.LONG].at_or_below(bid_high):
+            candidates[position.id] = position
+        for position in self.adverse[Direction.SHORT].at_or_below(ask_high):
+            candidates[position.id] = position
+        for position in self.favorable[Direction.SHORT].at_or_above(ask_low):
+            candidates[position.id] = position
+
+        return list(candidates.values())
+
+    @staticmethod
+    def _levels(
+        position: Position, price_open: float
+    ) -> Tuple[Optional[float], Optional[float]]:
+        # margin and stop-loss share the adverse side, only the nearer one
+        # matters; the tolerance keeps candidates that pass only after the
+        # unit profit and the account profit are rounded
+        if position.amount == 0:
+            # nothing at stake, the margin check closes it on the next refresh
+            return position.direction.value * math.inf, None
+
+        distance_margin = position.margin / position.amount
+        distance_adverse = (
+            distance_margin if position.stop_loss is None
+            else min(distance_margin, position.stop_loss)
+        )
+
+        tolerance = (
+            10 ** -position.instrument.display_presicion
+            + 10 ** -position.base_currency.decimals / position.amount
+        )
+
+        sign = position.direction.value
+        adverse = price_open - sign * (distance_adverse - tolerance)
+
+        favorable = None
+        if position.take_profit is not None and not math.isnan(position.take_profit):
+            favorable = price_open + sign * (position.take_profit - tolerance)
+
+        return adverse, favorable
@@ -0,0 +1,36 @@
+from benchmark.synthetic import SyntheticMarket
+from market_api.candle_manifest import CandleManifest
+from market_api.granularity import Granularity
+from market_api.local_provider import LocalProvider
+import datetime as dt
+import glob
+import os
+
+
+TIME_FROM = dt.datetime(2023, 1, 2, tzinfo=dt.timezone.utc)
+TIME_TO = dt.datetime(2023, 1, 20, tzinfo=dt.timezone.utc)
+
+
+def test_candles_never_write_into_the_data_directory(tmp_path, monkeypatch):
+    market = SyntheticMarket()
+    frame = market.candles(Granularity.H1, TIME_FROM, TIME_TO)
+
+    market.write_parquets(LocalProvider(str(tmp_path)), 'EUR_USD', Granularity.H1, TIME_FROM, TIME_TO)
+    for path in glob.glob(f'{tmp_path}/**/manifest.json', recursive=True):
+        os.remove(path)
+
+    def save(manifest: CandleManifest):
+        raise PermissionError(manifest.path)
+
+    monkeypatch.setattr(CandleManifest, 'save', save)
+
+    provider = LocalProvider(str(tmp_path))
+    timeframe = provider.candles('EUR_USD', Granularity.H1, 'MBA', TIME_FROM, TIME_TO)
+
+    assert len(timeframe.data) == len(frame[frame.time <= TIME_TO])
+    assert not glob.glob(f'{tmp_path}/**/manifest.json', recursive=True)
+
+    # chunks indexed once are reused by later reads of the same provider
+    manifest = provider.manifest('EUR_USD', Granularity.H1)
+    assert provider.manifest('EUR_USD', Granularity.H1) is manifest
+    assert len(manifest.chunks) > 0
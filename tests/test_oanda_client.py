@@ -0,0 +1,379 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from typing import Dict, List, Tuple
+from market_api.granularity import Granularity
+from market_api.candle_storage import CandleStorage
+from market_api.arrow_store import ArrowStore
+from market_api.oanda.client import Client
+import datetime as dt
+import pandas as pd
+import threading
+import requests
+import pytest
+import json
+import time
+import os
+
+
+class StandInServer:
+
+    delay: float
+    failures: int
+    status: int
+
+    requests: List[Tuple[float, Dict[str, str]]]
+    active: int
+    peak: int
+
+    httpd: ThreadingHTTPServer
+    url: str
+
+    _lock: threading.Lock
+    _failed: Dict[str, int]
+
+    def __init__(self):
+        self.delay = 0.0
+        self.failures = 0
+        self.status = 503
+
+        self.requests = []
+        self.active = 0
+        self.peak = 0
+
+        self._lock = threading.Lock()
+        self._failed = {}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.handle(self)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/v3'
+
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        params = {key: values[0] for key, values in parse_qs(urlparse(handler.path).query).items()}
+
+        with self._lock:
+            self.requests.append((time.monotonic(), params))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+            key = params.get('from', '')
+            failed = self._failed.get(key, 0)
+            fail = failed < self.failures
+            self._failed[key] = failed + 1
+
+        try:
+            time.sleep(self.delay)
+
+            if fail:
+                handler.send_response(self.status)
+                handler.send_header('Content-Length', '0')
+                handler.end_headers()
+                return
+
+            body = json.dumps({'candles': self.candles(params)}).encode()
+
+            handler.send_response(200)
+            handler.send_header('Content-Length', str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    @staticmethod
+    def candles(params: Dict[str, str]) -> List[Dict]:
+        delta = Granularity(params['granularity']).time_delta
+        now = pd.Timestamp.now(tz='UTC')
+
+        times = pd.date_range(
+            pd.Timestamp(params['from'], tz='UTC'), pd.Timestamp(params['to'], tz='UTC'),
+            freq=delta, inclusive='left',
+        )
+
+        return [
+            {
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S.000000000Z'),
+                'volume': 1,
+                'complete': bool(time + delta <= now),
+                **{
+                    price: {oh: f'{1 + time.hour / 100:.5f}' for oh in 'ohlc'}
+                    for price in ('mid', 'bid', 'ask')
+                },
+            }
+            for time in times
+        ]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = StandInServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def make_client(server, tmp_path):
+    def make_client(requests_per_second: float = 1000, **attributes) -> Client:
+        client = Client('account', 'key')
+        client.requests_per_second = requests_per_second
+        client.OANDA_URL = server.url
+        client.data_directory = str(tmp_path)
+        client.cache_candles = 24
+        client.backoff = 0.01
+
+        for name, value in attributes.items():
+            setattr(client, name, value)
+
+        return client
+
+    return make_client
+
+
+TIME_FROM = dt.datetime(2023, 1, 2, tzinfo=dt.timezone.utc)
+TIME_TO = dt.datetime(2023, 1, 9, 23, tzinfo=dt.timezone.utc)
+
+
+def test_candles_downloads_chunks_concurrently(server, make_client):
+    server.delay = 0.1
+    client = make_client(workers=4)
+
+    timeframe = client.candles('EUR_USD', Granularity.H1, 'MBA', TIME_FROM, TIME_TO)
+
+    assert len(server.requests) == 8
+    assert 1 < server.peak <= 4
+    assert timeframe.data.index.equals(
+        pd.date_range(TIME_FROM, TIME_TO, freq='h', name='time')
+    )
+
+
+def test_candles_reuses_complete_chunks(server, make_client):
+    client = make_client()
+    client.candles('EUR_USD', Granularity.H1, 'MBA', TIME_FROM, TIME_TO)
+
+    timeframe = client.candles('EUR_USD', Granularity.H1, 'MBA', TIME_FROM, TIME_TO)
+
+    assert len(server.requests) == 8
+    assert len(timeframe.data) == 8 * 24
+
+
+def test_prefetch_downloads_every_symbol_and_granularity_once(server, make_client):
+    client = make_client()
+    symbols = ['EUR_USD', 'GBP_USD']
+    granularities = [Granularity.H1, Granularity.H4]
+
+    client.prefetch(symbols, granularities, 'MBA', TIME_FROM, TIME_TO)
+    requests_count = len(server.requests)
+
+    for symbol in symbols:
+        for granularity in granularities:
+            client.candles(symbol, granularity, 'MBA', TIME_FROM, TIME_TO)
+
+    assert requests_count > 0
+    assert len(server.requests) == requests_count
+
+
+def test_rate_limit_spaces_requests(server, make_client):
+    client = make_client(requests_per_second=20, workers=8)
+
+    client.candles('EUR_USD', Granularity.H1, 'MBA', TIME_FROM, TIME_TO)
+
+    assert_spaced(server.requests, 1 / 20)
+
+
+def test_rate_limit_follows_a_retuned_client(server, make_client):
+    client = make_client(workers=8)
+    client.candles('EUR_USD', Granularity.H1, 'MBA', TIME_FROM, TIME_TO)
+    requests_count = len(server.requests)
+
+    client.requests_per_second = 20
+    client.candles('EUR_USD', Granularity.M30, 'MBA', TIME_FROM, TIME_TO)
+
+    assert len(server.requests) > requests_count
+    assert_spaced(server.requests[requests_count:], 1 / 20)
+
+
+def test_retries_go_through_the_rate_limiter(server, make_client):
+    server.failures = 2
+    client = make_client(requests_per_second=50)
+
+    timeframe = client.candles('EUR_USD', Granularity.H1, 'MBA', TIME_FROM, TIME_TO)
+
+    assert len(server.requests) == 8 * 3
+    assert len(timeframe.data) == 8 * 24
+    assert_spaced(server.requests, 1 / 50)
+
+
+def test_retries_rate_limit_responses(server, make_client):
+    server.failures = 1
+    server.status = 429
+    client = make_client()
+
+    timeframe = client.candles('EUR_USD', Granularity.H1, 'MBA', TIME_FROM, TIME_TO)
+
+    assert len(server.requests) == 8 * 2
+    assert len(timeframe.data) == 8 * 24
+
+
+def test_gives_up_after_the_configured_retries(server, make_client):
+    server.failures = 100
+    client = make_client(retries=2)
+
+    with pytest.raises(requests.HTTPError):
+        client.candles(
+            'EUR_USD', Granularity.H1, 'MBA', TIME_FROM, TIME_FROM + dt.timedelta(hours=1)
+        )
+
+    assert len(server.requests) == 3
+
+
+def test_refresh_requests_only_candles_after_the_last_complete_one(server, make_client):
+    client = make_client()
+    time_to = settled_now(Granularity.S5, client.cache_candles)
+    time_from = time_to - dt.timedelta(minutes=10)
+
+    client.candles('EUR_USD', Granularity.S5, 'MBA', time_from, time_to)
+
+    manifest = client.manifest('EUR_USD', Granularity.S5)
+    chunk = max(manifest.chunks.values(), key=lambda chunk: chunk.period_start)
+    kept = pd.Timestamp(chunk.time_complete, tz='UTC')
+    requests_count = len(server.requests)
+
+    refreshable(kept, Granularity.S5)
+    client.candles('EUR_USD', Granularity.S5, 'MBA', time_from, time_to)
+
+    assert len(server.requests) == requests_count + 1
+
+    params = server.requests[-1][1]
+    assert_requested_up_to_now(params)
+    assert pd.Timestamp(params['from'], tz='UTC') == kept + Granularity.S5.time_delta
+
+    stored = pd.read_parquet(manifest.full_path(chunk))
+
+    assert stored.time.dtype == 'datetime64[ns, UTC]'
+    assert stored.time.is_unique and stored.time.is_monotonic_increasing
+    assert stored.complete.iloc[:-1].all()
+
+
+def test_requests_the_current_chunk_up_to_now_in_utc(server, make_client):
+    client = make_client()
+    time_to = settled_now(Granularity.S5, client.cache_candles)
+
+    client.candles(
+        'EUR_USD', Granularity.S5, 'MBA', time_to - dt.timedelta(minutes=10), time_to,
+    )
+
+    assert_requested_up_to_now(max(
+        (params for _, params in server.requests), key=lambda params: params['from'],
+    ))
+
+
+def test_refresh_downloads_a_chunk_with_other_dtypes_whole(server, make_client):
+    client = make_client()
+    time_to = settled_now(Granularity.S5, client.cache_candles)
+    time_from = time_to - dt.timedelta(minutes=10)
+
+    client.candles('EUR_USD', Granularity.S5, 'MBA', time_from, time_to)
+
+    manifest = client.manifest('EUR_USD', Granularity.S5)
+    chunk = max(manifest.chunks.values(), key=lambda chunk: chunk.period_start)
+
+    legacy = pd.read_parquet(manifest.full_path(chunk))
+    legacy['time'] = legacy.time.dt.tz_localize(None)
+    legacy.to_parquet(manifest.full_path(chunk))
+
+    client.candles('EUR_USD', Granularity.S5, 'MBA', time_from, time_to)
+
+    params = server.requests[-1][1]
+    assert pd.Timestamp(params['from'], tz='UTC').value == chunk.period_start
+
+    stored = pd.read_parquet(manifest.full_path(chunk))
+
+    assert stored.time.dtype == 'datetime64[ns, UTC]'
+    assert stored.time.is_unique and stored.time.is_monotonic_increasing
+
+
+def test_arrow_store_maps_complete_chunks_only(server, make_client):
+    client = make_client(storage=CandleStorage.ARROW)
+    time_to = settled_now(Granularity.S5, client.cache_candles)
+    time_from = time_to - dt.timedelta(minutes=10)
+
+    client.candles('EUR_USD', Granularity.S5, 'MBA', time_from, time_to)
+
+    store = ArrowStore(client.data_directory)
+    mapped = os.stat(store.path('EUR_USD', Granularity.S5))
+    requests_count = len(server.requests)
+
+    manifest = client.manifest('EUR_USD', Granularity.S5)
+    chunk = max(manifest.chunks.values(), key=lambda chunk: chunk.period_start)
+    refreshable(pd.Timestamp(chunk.time_complete, tz='UTC'), Granularity.S5)
+
+    timeframe = client.candles('EUR_USD', Granularity.S5, 'MBA', time_from, time_to)
+
+    # the incomplete chunk was refreshed without rewriting the mapped file
+    assert len(server.requests) == requests_count + 1
+    assert os.stat(store.path('EUR_USD', Granularity.S5)).st_ino == mapped.st_ino
+    assert store.coverage('EUR_USD', Granularity.S5)[1] <= pd.Timestamp(time_to).value
+
+    # the same chunks read back without refreshing them again
+    client.storage = CandleStorage.PARQUET
+    client.refresh_incomplete = False
+    parquet = client.candles('EUR_USD', Granularity.S5, 'MBA', time_from, time_to)
+
+    assert timeframe.data.equals(parquet.data)
+    assert timeframe.data.index[-1].value >= store.coverage('EUR_USD', Granularity.S5)[1]
+
+
+def settled_now(granularity: Granularity, cache_candles: int) -> dt.datetime:
+    # the current chunk holds a complete candle and does not end halfway
+    # through the test
+    now = dt.datetime.now(dt.timezone.utc)
+    period_start, period_end = next(granularity.range_periods(
+        cache_candles, now, now + dt.timedelta(microseconds=1),
+    ))
+
+    if now - period_start < 2 * granularity.time_delta:
+        time.sleep((period_start + 2 * granularity.time_delta - now).total_seconds())
+    elif period_end - now < dt.timedelta(seconds=5):
+        time.sleep((period_end - now + 2 * granularity.time_delta).total_seconds())
+
+    return dt.datetime.now(dt.timezone.utc)
+
+
+def refreshable(kept: pd.Timestamp, granularity: Granularity):
+    # requests are made in whole seconds, within the first second of the
+    # incomplete candle there is nothing to refresh yet
+    ready = kept + granularity.time_delta + pd.Timedelta(seconds=1)
+    time.sleep(max((ready - pd.Timestamp.now(tz='UTC')).total_seconds(), 0))
+
+
+def assert_requested_up_to_now(params: Dict[str, str]):
+    time_from = pd.Timestamp(params['from'], tz='UTC')
+    time_to = pd.Timestamp(params['to'], tz='UTC')
+
+    assert time_from < time_to
+    assert abs(pd.Timestamp.now(tz='UTC') - time_to) < pd.Timedelta(minutes=1)
+
+
+def assert_spaced(server_requests: List[Tuple[float, Dict[str, str]]], interval: float):
+    times = sorted(time for time, _ in server_requests)
+    window = min(10, len(times))
+
+    # single arrivals jitter between the limiter and the server,
+    # every few consecutive requests still span the limited interval
+    spans = [later - earlier for earlier, later in zip(times, times[window - 1:])]
+
+    assert min(spans) >= (window - 1) * interval * 0.8
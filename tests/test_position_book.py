@@ -0,0 +1,190 @@
+from typing import List, Tuple
+from market_api.currency import Currency
+from market_api.granularity import Granularity
+from market_api.instrument_meta import InstrumentMeta
+from market_api.instrument_data import InstrumentData
+from market_api.timeframe import Timeframe
+from simulator.account import Account
+from simulator.context import Context
+from simulator.direction import Direction
+from simulator.position import Position
+from simulator.trade_journal import TradeJournal
+from simulator.lot import Lot
+import datetime as dt
+import pandas as pd
+import numpy as np
+
+
+TIME_FROM = dt.datetime(2024, 4, 1, tzinfo=dt.timezone.utc)
+PRICE = 1.1
+HALF_SPREAD = 0.00005
+
+
+def market(candles: List[Tuple[float, float, float, float]]) -> List[Context]:
+    # mid candles as (open, high, low, close), bid and ask half a pip around them
+    meta = InstrumentMeta('EUR_USD', 'CURRENCY', 'EUR/USD', 5, -4, 0, 0.0333)
+    times = pd.date_range(TIME_FROM, periods=len(candles), freq='1min')
+    mid = np.array(candles)
+
+    data = {'time': times, 'volume': 1, 'complete': True}
+    for price, shift in (('mid', 0.0), ('bid', -HALF_SPREAD), ('ask', HALF_SPREAD)):
+        for index, column in enumerate(('o', 'h', 'l', 'c')):
+            data[f'{price}_{column}'] = np.round(mid[:, index] + shift, 5)
+
+    instrument_data = InstrumentData(meta)
+    instrument_data.add_timeframe(Timeframe('EUR_USD', Granularity.M1, pd.DataFrame(data)))
+
+    contexts = []
+    for time in times:
+        context = Context(time.to_pydatetime())
+        context.add_instrument(instrument_data)
+        contexts.append(context)
+
+    return contexts
+
+
+def flat(count: int) -> List[Tuple[float, float, float, float]]:
+    return [(PRICE, PRICE, PRICE, PRICE)] * count
+
+
+def open_account(context: Context) -> Account:
+    account = Account(50000, Currency.USD, TradeJournal.MEMORY)
+    account.refresh(context)
+    return account
+
+
+def open_long(account: Account, **levels) -> Position:
+    return account.position_open('EUR_USD', Lot.MICRO, 1, Direction.LONG, **levels)
+
+
+def test_handler_closing_its_position_directly():
+    contexts = market(flat(10))
+    account = open_account(contexts[0])
+
+    position = open_long(account)
+    position.add_handler(
+        lambda position, context: context.time >= contexts[3].time and position.close(context)
+    )
+    other = open_long(account, stop_loss=0.01)
+
+    for context in contexts[1:]:
+        account.refresh(context)
+
+    assert not position.running
+    assert position.close_type == Position.CloseType.USER
+    assert position.time_close == contexts[3].time
+    assert account.positions_running == [other]
+    assert account.count_closed == 1
+    assert len(account.position_books['EUR_USD'].triggers) == 1
+
+
+def test_handler_closing_through_the_account_keeps_other_levels():
+    contexts = market(flat(5))
+    account = open_account(contexts[0])
+
+    position = open_long(account, stop_loss=0.01)
+    position.add_handler(lambda position, context: account.position_close(position.id))
+    others = [open_long(account, stop_loss=0.02), open_long(account, stop_loss=0.03)]
+
+    for context in contexts[1:]:
+        account.refresh(context)
+
+    book = account.position_books['EUR_USD']
+
+    assert account.positions_running == others
+    assert sorted(book.stop_loss[:len(book)]) == [0.02, 0.03]
+    assert len(book.triggers) == 2
+
+
+def test_handler_stop_loss_edit_triggers_in_the_same_step():
+    candles = flat(3) + [(PRICE, PRICE, PRICE - 0.003, PRICE)]
+    contexts = market(candles)
+    account = open_account(contexts[0])
+
+    position = open_long(account, stop_loss=0.01)
+
+    def trail(position: Position, context: Context):
+        position.stop_loss = 0.002
+
+    position.add_handler(trail)
+
+    for context in contexts[1:]:
+        account.refresh(context)
+
+    assert position.close_type == Position.CloseType.STOP_LOSS
+    assert position.time_close == contexts[3].time
+
+
+def test_take_profit_edit_outside_handlers_triggers():
+    candles = flat(2) + [(PRICE, PRICE + 0.003, PRICE, PRICE)]
+    contexts = market(candles)
+    account = open_account(contexts[0])
+
+    position = open_long(account, take_profit=0.01)
+    account.refresh(contexts[1])
+
+    position.take_profit = 0.002
+    account.refresh(contexts[2])
+
+    assert position.close_type == Position.CloseType.TAKE_PROFIT
+    assert position.unit_profit() >= 0.002
+
+
+def test_stop_loss_wins_over_take_profit_in_the_same_candle():
+    candles = flat(1) + [(PRICE, PRICE + 0.003, PRICE - 0.003, PRICE)]
+    contexts = market(candles)
+    account = open_account(contexts[0])
+
+    position = open_long(account, take_profit=0.002, stop_loss=0.002)
+    account.refresh(contexts[1])
+
+    assert position.close_type == Position.CloseType.STOP_LOSS
+
+
+def test_margin_wins_over_stop_loss_in_the_same_candle():
+    candles = flat(1) + [(PRICE, PRICE, PRICE - 0.05, PRICE)]
+    contexts = market(candles)
+    account = open_account(contexts[0])
+
+    position = open_long(account, stop_loss=0.002)
+    account.refresh(contexts[1])
+
+    assert position.close_type == Position.CloseType.MARGIN
+
+
+def test_payback_rounds_every_position_like_position_payback():
+    rng = np.random.default_rng(0)
+    closes = np.round(PRICE + np.cumsum(rng.normal(0, 0.0003, 51)), 5)
+
+    # open prices are candle means, finer than the display precision
+    contexts = market([
+        (open, max(open, close) + 0.00013, min(open, close) - 0.00021, close)
+        for open, close in zip(closes, closes[1:])
+    ])
+    account = open_account(contexts[0])
+
+    for step, context in enumerate(contexts[1:]):
+        account.refresh(context)
+
+        if step < 6:
+            direction = Direction.LONG if step % 2 else Direction.SHORT
+            account.position_open('EUR_USD', Lot.MINI, step + 1, direction)
+
+        payback = sum(
+            position.payback_convert(account.currency)
+            for position in account.positions_running
+        )
+
+        assert account.payback_running == account.currency.round(payback)
+        assert account.equity == account.currency.round(account.balance + payback)
+
+
+def test_position_without_units_closes_on_margin():
+    contexts = market(flat(3))
+    account = open_account(contexts[0])
+
+    position = account.position_open('EUR_USD', Lot.MICRO, 0, Direction.SHORT)
+    account.refresh(contexts[1])
+
+    assert position.close_type == Position.CloseType.MARGIN
+    assert account.count_running == 0
@@ -0,0 +1,29 @@
+from simulator.render_thread import RenderThread, Snapshot
+from simulator.watch_list import WatchList
+from rich.console import Console
+from rich.live import Live
+import io
+
+
+def test_waits_for_the_renderer_before_the_next_snapshot():
+    rendered = []
+    live = Live(console=Console(file=io.StringIO()))
+
+    def render(snapshot: Snapshot) -> str:
+        rendered.append(snapshot)
+        return ''
+
+    render_thread = RenderThread(live, render, 1000)
+    first = Snapshot([], WatchList(), [])
+    last = Snapshot([], WatchList(), [])
+
+    assert render_thread.waiting
+    render_thread.publish(first)
+    assert not render_thread.waiting
+
+    render_thread.start()
+    render_thread.publish(last)
+    render_thread.stop()
+
+    assert render_thread.waiting
+    assert rendered[-1] is last
@@ -0,0 +1,50 @@
+from simulator.trade_journal import TradeJournal
+import pickle
+import gc
+import os
+
+
+def test_close_removes_the_temporary_directory():
+    journal = TradeJournal()
+    assert os.path.isdir(journal.directory)
+
+    journal.close()
+
+    assert not os.path.exists(journal.directory)
+
+
+def test_collected_journal_removes_the_temporary_directory():
+    directory = TradeJournal().directory
+    gc.collect()
+
+    assert not os.path.exists(directory)
+
+
+def test_close_keeps_a_given_directory(tmp_path):
+    journal = TradeJournal(str(tmp_path / 'journal'))
+    journal.close()
+
+    assert os.path.isdir(tmp_path / 'journal')
+
+
+def test_restored_journal_leaves_the_directory_to_its_owner():
+    journal = TradeJournal()
+    restored = pickle.loads(pickle.dumps(journal))
+
+    restored.close()
+    assert os.path.isdir(journal.directory)
+
+    journal.close()
+    assert not os.path.exists(journal.directory)
+
+
+def test_restored_journal_owns_a_directory_it_recreates():
+    journal = TradeJournal()
+    state = pickle.dumps(journal)
+    journal.close()
+
+    restored = pickle.loads(state)
+    assert os.path.isdir(restored.directory)
+
+    restored.close()
+    assert not os.path.exists(restored.directory)